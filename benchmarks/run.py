@@ -0,0 +1,213 @@
+"""
+Benchmark of glacier CLI construction and dispatch.
+
+Synthetic CLIs of N functions x M parameters are generated for each docstring
+style, and the results are emitted as JSON so that they can be compared
+between releases.
+
+    python benchmarks/run.py --functions 100 --params 8 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib.util import module_from_spec, spec_from_file_location
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from click.testing import CliRunner  # noqa: E402
+
+from glacier.core import GlacierFunction, _get_click_command, glacier_group  # noqa: E402
+
+try:
+    from glacier.docstring import clear_parse_cache
+except ImportError:
+    # Releases before the docstring parsing is memoized, which have nothing to clear.
+    def clear_parse_cache() -> None:
+        pass
+
+
+STYLES = ['google', 'numpy', 'rest']
+
+
+def _get_docstring(style: str, params: List[str]) -> str:
+    lines = ['    """', '    Synthetic command for benchmark.', '']
+    if style == 'google':
+        lines.append('    Args:')
+        lines.extend(f'        {param}: Description of {param}.' for param in params)
+    elif style == 'numpy':
+        lines.extend(['    Parameters', '    ----------'])
+        for param in params:
+            lines.extend([f'    {param}: str', f'        Description of {param}.'])
+    else:
+        lines.extend(f'    :param {param}: Description of {param}.' for param in params)
+    lines.append('    """')
+    return '\n'.join(lines)
+
+
+def generate_source(n_functions: int, n_params: int, style: str) -> str:
+    """
+    Generate the source of module which has `n_functions` functions with `n_params` parameters.
+    """
+    chunks = ['from enum import Enum', '', '', 'class Env(Enum):', "    DEV = 'dev'", "    PROD = 'prod'", '']
+    for i in range(n_functions):
+        params = [f'param_{j}' for j in range(n_params)]
+        annotations = ['str', 'int', 'bool', 'Env']
+        args = ', '.join(f'{param}: {annotations[j % len(annotations)]}' for j, param in enumerate(params))
+        chunks.extend(['', f'def command_{i}({args}) -> None:', _get_docstring(style, params), '    pass', ''])
+    return '\n'.join(chunks)
+
+
+def load_functions(directory: str, n_functions: int, n_params: int, style: str) -> List[Callable[..., Any]]:
+    path = os.path.join(directory, f'bench_{style}.py')
+    with open(path, 'w') as source:
+        source.write(generate_source(n_functions, n_params, style))
+    spec = spec_from_file_location(f'bench_{style}', path)
+    assert spec is not None and spec.loader is not None
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return [getattr(module, f'command_{i}') for i in range(n_functions)]
+
+
+def get_args(n_params: int) -> List[str]:
+    values = ['value', '1', None, 'dev']
+    args = []
+    for j in range(n_params):
+        value = values[j % len(values)]
+        args.append(f'--param-{j}')
+        if value is not None:
+            args.append(value)
+    return args
+
+
+def measure(f: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    elapsed = []
+    for _ in range(repeat):
+        clear_parse_cache()
+        start = time.perf_counter()
+        f()
+        elapsed.append(time.perf_counter() - start)
+    return {
+        'min_ms': min(elapsed) * 1000,
+        'median_ms': statistics.median(elapsed) * 1000,
+    }
+
+
+def measure_peak_memory(f: Callable[[], Any]) -> int:
+    clear_parse_cache()
+    tracemalloc.start()
+    try:
+        f()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_import_time(repeat: int) -> Dict[str, float]:
+    """
+    Measure the cumulative import time of glacier reported by `-X importtime`.
+    """
+    elapsed = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import glacier'],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        for line in proc.stderr.splitlines():
+            fields = [field.strip() for field in line.split('|')]
+            if len(fields) == 3 and fields[2] == 'glacier':
+                elapsed.append(int(fields[1]) / 1000)
+    return {
+        'min_ms': min(elapsed),
+        'median_ms': statistics.median(elapsed),
+    }
+
+
+def run_style(functions: List[Callable[..., Any]], n_params: int, repeat: int) -> Dict[str, Any]:
+    runner = CliRunner()
+    units: List[GlacierFunction] = list(functions)
+    target = functions[len(functions) // 2]
+    target_name = target.__name__.replace('_', '-')
+    args = get_args(n_params)
+
+    def build_all() -> None:
+        for f in functions:
+            _get_click_command(f)
+
+    def dispatch() -> None:
+        result = runner.invoke(glacier_group(units), [target_name, *args])
+        assert result.exit_code == 0, result.output
+
+    def group_help() -> None:
+        result = runner.invoke(glacier_group(units), ['-h'])
+        assert result.exit_code == 0, result.output
+
+    command = _get_click_command(target)
+    callback = command.callback
+    assert callback is not None
+    params = command.make_context(target_name, list(args)).params
+
+    def call_callback() -> None:
+        # Argument conversion overhead of the repeated invocation (e.g., batch and fan-out).
+        for _ in range(1000):
+            callback(**params)
+
+    def command_help() -> None:
+        result = runner.invoke(glacier_group(units), [target_name, '-h'])
+        assert result.exit_code == 0, result.output
+
+    return {
+        'build_group_ms': measure(lambda: glacier_group(units), repeat),
+        'build_all_commands_ms': measure(build_all, repeat),
+        'dispatch_ms': measure(dispatch, repeat),
+        'callback_1000_calls_ms': measure(call_callback, repeat),
+        'group_help_ms': measure(group_help, repeat),
+        'command_help_ms': measure(command_help, repeat),
+        'build_all_commands_peak_memory_bytes': measure_peak_memory(build_all),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--functions', type=int, default=100, help='Number of functions (subcommands).')
+    parser.add_argument('--params', type=int, default=8, help='Number of parameters of each function.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of repetition of each measurement.')
+    parser.add_argument('--styles', nargs='+', choices=STYLES, default=STYLES, help='Docstring styles.')
+    parser.add_argument('--output', help='Path of the JSON output (stdout if omitted).')
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'functions': args.functions,
+        'params': args.params,
+        'repeat': args.repeat,
+        'import_ms': measure_import_time(args.repeat),
+        'styles': {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for style in args.styles:
+            functions = load_functions(directory, args.functions, args.params, style)
+            results['styles'][style] = run_style(functions, args.params, args.repeat)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
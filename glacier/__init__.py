@@ -1,3 +1,15 @@
-from .core import glacier
+from time import perf_counter
 
-__all__ = ['glacier']
+# Reported by the profiler (see `glacier.profiling`).
+_import_started = perf_counter()
+
+# Kept in sync with pyproject.toml.
+__version__ = '0.4.5'
+
+from .concurrency import concurrently  # noqa: E402
+from .core import glacier  # noqa: E402
+from .misc import AsyncRunner  # noqa: E402
+
+_import_finished = perf_counter()
+
+__all__ = ['glacier', 'AsyncRunner', 'concurrently', '__version__']
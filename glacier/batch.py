@@ -0,0 +1,91 @@
+"""
+Batch mode which executes many command lines in one process.
+"""
+
+import shlex
+import sys
+import traceback
+from typing import IO, Any, List, Optional
+
+import click
+
+BATCH_HELP = 'Read command lines from stdin and execute each of them.'
+
+
+def invoke_args(command: click.Command, args: List[str], prog_name: Optional[str] = None) -> int:
+    """
+    Invoke the command with the arguments (as `command.main` does), and return the exit code.
+    """
+    try:
+        with command.make_context(prog_name, args) as ctx:
+            command.invoke(ctx)
+        return 0
+    except click.exceptions.Exit as e:
+        return e.exit_code
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.Abort:
+        click.echo('Aborted!', err=True)
+        return 1
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        click.echo(e.code, err=True)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def run_batch(command: click.Command, stream: IO[str], prog_name: Optional[str] = None) -> int:
+    """
+    Execute each (newline-delimited) command line read from the stream,
+    and report the exit code of each line to stderr.
+
+    Empty lines and lines starting with `#` are skipped. The prompt is shown
+    if the stream is interactive. Return 1 if any line failed, otherwise 0.
+    """
+    interactive = stream.isatty()
+    failed = False
+    lineno = 0
+    while True:
+        if interactive:
+            click.echo(f'{prog_name or command.name}> ', nl=False, err=True)
+        line = stream.readline()
+        if not line:
+            break
+        lineno += 1
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            click.echo(f'line {lineno}: {e}', err=True)
+            exit_code = 2
+        else:
+            exit_code = invoke_args(command, args, prog_name)
+        click.echo(f'line {lineno}: exit {exit_code}', err=True)
+        failed = failed or exit_code != 0
+    return 1 if failed else 0
+
+
+def _batch_callback(ctx: click.Context, param: click.Parameter, value: Any) -> None:
+    if not value or ctx.resilient_parsing:
+        return
+    ctx.exit(run_batch(ctx.command, sys.stdin, ctx.info_name))
+
+
+def get_batch_option() -> click.Option:
+    """
+    Return `--batch` option of the (root) command.
+    """
+    return click.Option(
+        ['--batch'],
+        is_flag=True,
+        is_eager=True,
+        expose_value=False,
+        callback=_batch_callback,
+        help=BATCH_HELP,
+    )
@@ -0,0 +1,179 @@
+"""
+Persistent cache of the specification derived from functions (the parsed docstring).
+The default values are always read from the functions, since they may be taken from another module.
+
+The cache is stored as one JSON file per source file, and every entry of it
+is invalidated when the source file (its mtime or size) or the version of
+glacier changes.
+"""
+
+import inspect
+import json
+import os
+import zlib
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+CACHE_FORMAT_VERSION = 2
+
+# Environment variables to configure the cache
+CACHE_DIR_ENV = 'GLACIER_CACHE_DIR'
+NO_CACHE_ENV = 'GLACIER_NO_CACHE'
+
+
+def get_default_cache_dir() -> Optional[str]:
+    """
+    Return the directory of cache, or None if the cache is disabled
+    by the environment variable.
+    """
+    if os.environ.get(NO_CACHE_ENV):
+        return None
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if cache_dir:
+        return cache_dir
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'glacier')
+
+
+def _get_glacier_version() -> str:
+    from glacier import __version__
+
+    # The source tree may be modified without changing the version.
+    stamp = _get_source_stamp(os.path.join(os.path.dirname(__file__), 'core.py'))
+    return '{}-{}'.format(__version__, stamp[0] if stamp else 0)
+
+
+def _get_source_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# mtime and size of each source file (None if missing)
+SourceStamps = Dict[str, Optional[Tuple[int, int]]]
+
+
+def get_source_stamps(paths: Iterable[str]) -> SourceStamps:
+    return {path: _get_source_stamp(path) for path in paths}
+
+
+def write_json_atomically(path: str, content: Any) -> None:
+    """
+    Write the JSON file by replacing it, so that readers never see a partially written file.
+    Failures are ignored since the cache is only the best effort.
+    """
+    import tempfile
+
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'w') as tmp_file:
+            json.dump(content, tmp_file)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        os.unlink(tmp_path)
+
+
+def get_source_path(f: Callable[..., Any]) -> Optional[str]:
+    """
+    Return the path of the file where the function is defined.
+    """
+    code = getattr(inspect.unwrap(f), '__code__', None)
+    if code is None:
+        return None
+    path: str = code.co_filename
+    if not os.path.isfile(path):
+        return None
+    return os.path.abspath(path)
+
+
+class SpecCache:
+    """
+    On-disk cache which maps a function to JSON-serializable value.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.version = f'{CACHE_FORMAT_VERSION}:{_get_glacier_version()}'
+        self._files: Dict[str, Dict[str, Any]] = {}
+
+    def _get_cache_path(self, source_path: str) -> str:
+        import hashlib
+
+        digest = hashlib.sha1(source_path.encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f'{digest}.json')
+
+    def _load(self, source_path: str) -> Dict[str, Any]:
+        if source_path in self._files:
+            return self._files[source_path]
+        stamp = _get_source_stamp(source_path)
+        content: Dict[str, Any] = {}
+        try:
+            with open(self._get_cache_path(source_path)) as cache_file:
+                content = json.load(cache_file)
+        except (OSError, ValueError):
+            pass
+        if (
+            not isinstance(content, dict)
+            or content.get('version') != self.version
+            or content.get('path') != source_path
+            or content.get('stamp') != list(stamp or [])
+        ):
+            content = {
+                'version': self.version,
+                'path': source_path,
+                'stamp': list(stamp or []),
+                'entries': {},
+            }
+        self._files[source_path] = content
+        return content
+
+    def _save(self, source_path: str) -> None:
+        write_json_atomically(self._get_cache_path(source_path), self._files[source_path])
+
+    @staticmethod
+    def _is_cacheable(f: Callable[..., Any]) -> bool:
+        # Functions defined in another function (e.g., made by the factory) share the name
+        # but may differ in the defaults and the annotations, so they are never cached.
+        # The signature overridden by `__signature__` may not match the defaults of the function.
+        unwrapped = inspect.unwrap(f)
+        return (
+            '<locals>' not in f.__qualname__
+            and not getattr(unwrapped, '__closure__', None)
+            and not hasattr(f, '__signature__')
+        )
+
+    @staticmethod
+    def _get_entry_key(f: Callable[..., Any]) -> str:
+        docstring = f.__doc__ or ''
+        return '{}:{}:{}:{}'.format(
+            f.__module__,
+            f.__qualname__,
+            f.__name__,
+            zlib.crc32(docstring.encode()),
+        )
+
+    def get(self, f: Callable[..., Any]) -> Optional[Any]:
+        source_path = get_source_path(f)
+        if source_path is None or not self._is_cacheable(f):
+            return None
+        return self._load(source_path)['entries'].get(self._get_entry_key(f))
+
+    def set(self, f: Callable[..., Any], value: Any) -> None:
+        source_path = get_source_path(f)
+        if source_path is None or not self._is_cacheable(f):
+            return
+        self._load(source_path)['entries'][self._get_entry_key(f)] = value
+        self._save(source_path)
+
+
+def get_default_spec_cache() -> Optional[SpecCache]:
+    cache_dir = get_default_cache_dir()
+    if cache_dir is None:
+        return None
+    return SpecCache(cache_dir)
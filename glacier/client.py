@@ -0,0 +1,151 @@
+"""
+Thin client of the glacier daemon, which depends only on the standard library.
+
+The invocation (argv, environment variables, current directory and the file
+descriptors of stdin/stdout/stderr) is forwarded to the daemon started by
+`glacier(f, daemon=True)`, so that the command runs without importing anything.
+If the daemon is not running, the script is executed normally (and starts the daemon).
+
+    python -m glacier.client path/to/cli.py [ARGS]...
+"""
+
+import hashlib
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def is_daemon_supported() -> bool:
+    return hasattr(socket, 'AF_UNIX') and hasattr(socket, 'send_fds') and hasattr(os, 'fork')
+
+
+def get_socket_dir() -> str:
+    """
+    Return the per-user directory of the sockets.
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'glacier')
+    return os.path.join(os.environ.get('TMPDIR', '/tmp'), f'glacier-{os.getuid()}')
+
+
+def get_socket_path(script_path: str) -> str:
+    """
+    Return the path of the socket of the daemon serving the script.
+    """
+    digest = hashlib.sha1(os.path.abspath(script_path).encode()).hexdigest()[:16]
+    return os.path.join(get_socket_dir(), f'{digest}.sock')
+
+
+def is_owned_privately(path: str, is_socket: bool = False) -> bool:
+    """
+    Return True if the path (not followed if symlink) is the directory (or the socket)
+    owned by the current user, which no other user can access.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if is_socket:
+        return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not stat.S_IMODE(st.st_mode) & 0o077
+
+
+def get_peer_uid(sock: socket.socket) -> Optional[int]:
+    """
+    Return the user id of the peer of the connected Unix domain socket, or None if it is unknown.
+    """
+    peer_cred = getattr(socket, 'SO_PEERCRED', None)
+    if peer_cred is not None:
+        # struct ucred of Linux: pid, uid, gid
+        _, uid, _ = struct.unpack('3i', sock.getsockopt(socket.SOL_SOCKET, peer_cred, struct.calcsize('3i')))
+        return int(uid)
+    return None
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any], fds: Sequence[int] = ()) -> None:
+    data = json.dumps(message).encode() + b'\n'
+    if fds:
+        sent = socket.send_fds(sock, [data], list(fds))
+        data = data[sent:]
+    sock.sendall(data)
+
+
+def forward(
+    socket_path: str,
+    argv: List[str],
+    fds: Sequence[int] = (0, 1, 2),
+) -> Optional[int]:
+    """
+    Forward the invocation to the daemon, and return the exit code of the command.
+
+    None is returned if the daemon is not available (or its sources are stale),
+    in which case the command has not been run.
+    """
+    if not is_daemon_supported():
+        return None
+    # The environment and the file descriptors must not be sent to the socket of another user.
+    if not is_owned_privately(os.path.dirname(socket_path)) or not is_owned_privately(socket_path, is_socket=True):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with sock:
+        try:
+            sock.connect(socket_path)
+            peer_uid = get_peer_uid(sock)
+            if peer_uid is not None and peer_uid != os.getuid():
+                return None
+            send_message(
+                sock,
+                {
+                    'argv': argv,
+                    'env': dict(os.environ),
+                    'cwd': os.getcwd(),
+                },
+                fds,
+            )
+        except OSError:
+            return None
+
+        pid: Optional[int] = None
+        reader = sock.makefile('rb')
+        while True:
+            try:
+                line = reader.readline()
+            except KeyboardInterrupt:
+                # Interrupt the command running in the daemon, and wait for its exit.
+                if pid is not None:
+                    os.kill(pid, signal.SIGINT)
+                continue
+            except OSError:
+                line = b''
+            if not line:
+                # Connection is lost after the command started.
+                return None if pid is None else 1
+            message = json.loads(line)
+            if 'pid' in message:
+                pid = message['pid']
+            elif 'exit' in message:
+                return int(message['exit'])
+            else:
+                return None
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(f'Usage: {os.path.basename(sys.executable)} -m glacier.client SCRIPT [ARGS]...', file=sys.stderr)
+        sys.exit(2)
+    script_path = sys.argv[1]
+    argv = [script_path, *sys.argv[2:]]
+    exit_code = forward(get_socket_path(script_path), argv)
+    if exit_code is None:
+        os.execv(sys.executable, [sys.executable, *argv])
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
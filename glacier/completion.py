@@ -0,0 +1,236 @@
+"""
+Fast path of the shell completion, which answers from a static index of the command tree.
+
+The index (subcommands, options, and the choices of the parameters) is written
+on the first completion after the source files or the registered commands change,
+and the following completions are answered by a stub command tree built from the index,
+without building the commands or importing the modules of the functions.
+Parameters whose completion is computed dynamically (i.e., the click type overrides
+`shell_complete` other than Choice, Path, and File) fall back to the full command tree.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+
+from glacier.misc import get_prog_name
+
+COMPLETION_INDEX_VERSION = 1
+
+# Instructions of click's shell completion answered by the index.
+SUPPORTED_INSTRUCTIONS = ('complete', 'source')
+
+
+class DynamicCompletionRequired(Exception):
+    """
+    Raised when the completion cannot be answered from the index.
+    """
+
+
+class _DynamicType(click.ParamType):
+    name = 'dynamic'
+
+    def shell_complete(self, ctx: click.Context, param: click.Parameter, incomplete: str) -> List[Any]:
+        raise DynamicCompletionRequired()
+
+
+def get_completion_request() -> Optional[Tuple[str, str, str]]:
+    """
+    Return (prog_name, complete_var, instruction) if the shell completion
+    which can be answered from the index is requested.
+    """
+    prog_name = get_prog_name()
+    complete_name = prog_name.replace('-', '_').replace('.', '_')
+    complete_var = f'_{complete_name}_COMPLETE'.upper()
+    instruction = os.environ.get(complete_var)
+    if not instruction or instruction.partition('_')[2] not in SUPPORTED_INSTRUCTIONS:
+        return None
+    return prog_name, complete_var, instruction
+
+
+def get_completion_index_path(cache_dir: str, script: str) -> str:
+    import hashlib
+
+    digest = hashlib.sha1(os.path.abspath(script).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, 'completion', f'{digest}.json')
+
+
+def _get_version(registration: str) -> str:
+    from glacier.cache import _get_glacier_version
+
+    return f'{COMPLETION_INDEX_VERSION}:{_get_glacier_version()}:{registration}'
+
+
+def _get_type_node(param_type: click.ParamType) -> Dict[str, Any]:
+    if isinstance(param_type, click.Choice):
+        return {'name': 'choice', 'choices': [str(choice) for choice in param_type.choices]}
+    if isinstance(param_type, click.Path):
+        return {'name': 'path', 'file_okay': param_type.file_okay, 'dir_okay': param_type.dir_okay}
+    if isinstance(param_type, click.File):
+        return {'name': 'path', 'file_okay': True, 'dir_okay': False}
+    if isinstance(param_type, click.Tuple):
+        if all(_get_type_node(item)['name'] == 'plain' for item in param_type.types):
+            return {'name': 'plain'}
+        return {'name': 'dynamic'}
+    if type(param_type).shell_complete is click.ParamType.shell_complete:
+        return {'name': 'plain'}
+    return {'name': 'dynamic'}
+
+
+def _get_param_node(param: click.Parameter) -> Dict[str, Any]:
+    return {
+        'kind': 'option' if isinstance(param, click.Option) else 'argument',
+        'name': param.name,
+        'opts': param.opts,
+        'secondary_opts': param.secondary_opts,
+        'nargs': param.nargs,
+        'multiple': param.multiple,
+        'required': param.required,
+        'is_flag': getattr(param, 'is_flag', False),
+        'count': getattr(param, 'count', False),
+        'hidden': getattr(param, 'hidden', False),
+        'help': getattr(param, 'help', None),
+        'type': _get_type_node(param.type),
+    }
+
+
+def get_command_node(command: click.Command) -> Dict[str, Any]:
+    """
+    Return the index of the command, building all its (lazy) subcommands.
+    """
+    node: Dict[str, Any] = {
+        'short_help': command.get_short_help_str(),
+        'hidden': command.hidden,
+        'help_option_names': command.context_settings.get('help_option_names', ['--help']),
+        'params': [_get_param_node(param) for param in command.params],
+    }
+    if isinstance(command, click.Group):
+        ctx = click.Context(command)
+        commands = {}
+        for cmd_name in command.list_commands(ctx):
+            subcommand = command.get_command(ctx, cmd_name)
+            if subcommand is not None:
+                commands[cmd_name] = get_command_node(subcommand)
+        node['commands'] = commands
+    return node
+
+
+def write_completion_index(path: str, command: click.Command, sources: List[str], registration: str = '') -> None:
+    from glacier.cache import get_source_stamps, write_json_atomically
+
+    write_json_atomically(
+        path,
+        {
+            'version': _get_version(registration),
+            'stamps': get_source_stamps(sources),
+            'root': get_command_node(command),
+        },
+    )
+
+
+def load_completion_index(path: str, sources: List[str], registration: str = '') -> Optional[Dict[str, Any]]:
+    """
+    Return the root node of the index, or None if it is missing or stale, i.e., any of `sources`
+    or `registration` (digest of the registered commands) is changed.
+    """
+    from glacier.cache import get_source_stamps
+
+    try:
+        with open(path) as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return None
+    stamps = {source: list(stamp) if stamp else None for source, stamp in get_source_stamps(sources).items()}
+    if (
+        not isinstance(index, dict)
+        or index.get('version') != _get_version(registration)
+        or index.get('stamps') != stamps
+    ):
+        return None
+    root: Dict[str, Any] = index['root']
+    return root
+
+
+def _get_stub_type(node: Dict[str, Any]) -> click.ParamType:
+    if node['name'] == 'choice':
+        return click.Choice(node['choices'])
+    if node['name'] == 'path':
+        return click.Path(file_okay=node['file_okay'], dir_okay=node['dir_okay'])
+    if node['name'] == 'dynamic':
+        return _DynamicType()
+    return click.STRING
+
+
+def _get_stub_param(node: Dict[str, Any]) -> click.Parameter:
+    if node['kind'] == 'argument':
+        return click.Argument(
+            [node['name']],
+            type=_get_stub_type(node['type']),
+            nargs=node['nargs'],
+            required=node['required'],
+        )
+    decls = [node['name']]
+    if node['secondary_opts']:
+        decls.extend(f'{opt}/{secondary_opt}' for opt, secondary_opt in zip(node['opts'], node['secondary_opts']))
+    else:
+        decls.extend(node['opts'])
+    kwargs: Dict[str, Any] = {}
+    if not node['is_flag'] and not node['count']:
+        kwargs['type'] = _get_stub_type(node['type'])
+        kwargs['nargs'] = node['nargs']
+    return click.Option(
+        decls,
+        is_flag=node['is_flag'] or None,
+        count=node['count'],
+        multiple=node['multiple'],
+        hidden=node['hidden'],
+        help=node['help'],
+        **kwargs,
+    )
+
+
+class StubGroup(click.Group):
+    """
+    Group of the index, which makes its subcommands on lookup.
+    """
+
+    def __init__(self, name: Optional[str], node: Dict[str, Any]) -> None:
+        super().__init__(name, **_get_stub_attrs(node))
+        self.nodes: Dict[str, Dict[str, Any]] = node['commands']
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return list(self.nodes.keys())
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        node = self.nodes.get(cmd_name)
+        return None if node is None else get_stub_command(cmd_name, node)
+
+
+def _get_stub_attrs(node: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'params': [_get_stub_param(param) for param in node['params']],
+        'short_help': node['short_help'],
+        'hidden': node['hidden'],
+        'context_settings': {'help_option_names': node['help_option_names']},
+    }
+
+
+def get_stub_command(name: Optional[str], node: Dict[str, Any]) -> click.Command:
+    if 'commands' in node:
+        return StubGroup(name, node)
+    return click.Command(name, **_get_stub_attrs(node))
+
+
+def complete_from_index(root: Dict[str, Any], prog_name: str, complete_var: str, instruction: str) -> Optional[int]:
+    """
+    Answer the completion by the stub command tree of the index, and return the exit code.
+    None is returned if the completion is dynamic, which needs the full command tree.
+    """
+    from click.shell_completion import shell_complete
+
+    try:
+        return shell_complete(get_stub_command(prog_name, root), {}, prog_name, complete_var, instruction)
+    except DynamicCompletionRequired:
+        return None
@@ -0,0 +1,133 @@
+"""
+Concurrent execution of an async function over the values of one parameter.
+"""
+
+import inspect
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import click
+
+# (index, succeeded, return value or exception)
+TaskResult = Tuple[int, bool, Any]
+
+CONCURRENCY_ATTRIBUTE = '__glacier_concurrency__'
+
+
+@dataclass(frozen=True)
+class Concurrency:
+    """
+    How to run the async function concurrently, which is attached by `concurrently`.
+    """
+
+    over: str
+    max_concurrency: Optional[int] = None
+    timeout: Optional[float] = None
+
+
+def concurrently(
+    over: str,
+    max_concurrency: Optional[int] = 10,
+    timeout: Optional[float] = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorator making the command built from the async function accept
+    multiple values of the parameter `over`, and run the function for each of them
+    concurrently on one event loop.
+
+    At most `max_concurrency` calls are in flight at once (unbounded if None),
+    and each call is cancelled if it does not complete within `timeout` seconds.
+    The non-None return values are written in the order of the values.
+    """
+
+    def decorator(f: Callable[..., Any]) -> Callable[..., Any]:
+        if not inspect.iscoroutinefunction(f):
+            raise TypeError(f'{f.__name__} must be an async function to run concurrently.')
+        if over not in inspect.signature(f).parameters:
+            raise TypeError(f'{f.__name__} has no parameter "{over}".')
+        setattr(f, CONCURRENCY_ATTRIBUTE, Concurrency(over, max_concurrency, timeout))
+        return f
+
+    return decorator
+
+
+def get_concurrency(f: Callable[..., Any]) -> Optional[Concurrency]:
+    return getattr(f, CONCURRENCY_ATTRIBUTE, None)
+
+
+async def bounded_map(
+    f: Callable[..., Any],
+    kwargs_list: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    ordered: bool = True,
+) -> AsyncIterator[TaskResult]:
+    """
+    Call the coroutine function with each keyword arguments concurrently,
+    and yield the results in the input order (or as they complete if not `ordered`).
+
+    The exception raised by a call (TimeoutError if it exceeds `timeout` seconds)
+    is yielded as the failed result instead of being raised.
+    In-flight calls are cancelled and awaited when the iteration stops,
+    e.g., by KeyboardInterrupt cancelling the running task.
+    """
+    import asyncio
+
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def call(kwargs: Dict[str, Any]) -> Any:
+        try:
+            return await asyncio.wait_for(f(**kwargs), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f'timed out after {timeout} seconds') from None
+
+    async def bounded_call(index: int, kwargs: Dict[str, Any]) -> TaskResult:
+        try:
+            if semaphore is None:
+                return index, True, await call(kwargs)
+            async with semaphore:
+                return index, True, await call(kwargs)
+        except Exception as e:
+            return index, False, e
+
+    tasks = [asyncio.ensure_future(bounded_call(index, kwargs)) for index, kwargs in enumerate(kwargs_list)]
+    try:
+        for task in tasks if ordered else asyncio.as_completed(tasks):
+            # Shielded not to cancel the awaited call ahead of the waiting ones.
+            yield await asyncio.shield(task)
+    finally:
+        # The waiting calls are cancelled first not to start in place of the cancelled ones.
+        for task in reversed(tasks):
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def get_concurrent_function(f: Callable[..., Any], concurrency: Concurrency) -> Callable[..., Any]:
+    """
+    Return the async function which receives the values of `concurrency.over`
+    as a sequence, and calls `f` for each of them concurrently.
+
+    The failed calls are reported to stderr, and ClickException is raised if any of them failed.
+    """
+
+    @wraps(f)
+    async def wrapped(**kwargs: Any) -> None:
+        values = kwargs.pop(concurrency.over)
+        kwargs_list = [{**kwargs, concurrency.over: value} for value in values]
+        failed_count = 0
+        async for index, succeeded, value in bounded_map(
+            f,
+            kwargs_list,
+            concurrency.max_concurrency,
+            concurrency.timeout,
+        ):
+            if not succeeded:
+                failed_count += 1
+                click.echo(f'{values[index]}: {type(value).__name__}: {value}', err=True)
+            elif value is not None:
+                click.echo(value)
+        if failed_count:
+            raise click.ClickException(f'{failed_count} of {len(values)} calls failed.')
+
+    return wrapped
@@ -1,21 +1,47 @@
 import functools
+import inspect
+import os
+import sys
 from enum import Enum
+from importlib.util import find_spec
 from inspect import Parameter, signature
-from typing import Any, Callable, Coroutine, Dict, List, Optional, Type, TypeVar, Union
+from dataclasses import dataclass
+from weakref import WeakKeyDictionary
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    get_type_hints,
+)
 
 import click
 
-try:
-    import click_completion
-
-    loads_completion = True
-except Exception:
-    loads_completion = False
-    ...
-from click_help_colors import HelpColorsCommand, HelpColorsGroup
+from glacier.cache import SpecCache, get_default_cache_dir, get_default_spec_cache, get_source_path
+from glacier.concurrency import Concurrency, get_concurrency, get_concurrent_function
+from glacier.docstring import Doc, parse_docstring
+from glacier.misc import (
+    AsyncRunner,
+    coro,
+    get_default_runner,
+    get_import_path_docstring,
+    get_import_path_source,
+    get_prog_name,
+    import_string,
+)
 
-from glacier.docstring import Doc, GoogleParser, NumpyParser, Parser, RestructuredTextParser
-from glacier.misc import coro
+if TYPE_CHECKING:
+    # The optional machinery is imported by the code paths using it, to keep `import glacier` fast.
+    from glacier.help import HelpCache
+    from glacier.middleware import Middleware
+    from glacier.type_handlers import TypeHandler
 
 """
 # TODO
@@ -24,7 +50,10 @@ from glacier.misc import coro
 - [ ] Parse python docstring to display help.
 """
 
-T = TypeVar('T')
+# click_completion is imported only when the completion is actually requested.
+loads_completion = find_spec('click_completion') is not None
+
+CommandFactory = Callable[[], click.Command]
 
 
 CONTEXT_SETTINGS = dict(
@@ -37,9 +66,12 @@ DEFAULT_COLOR_OPTIONS = dict(
 )
 
 
+# A function can also be given by its import path ("package.module:function"),
+# whose module is imported only when the subcommand is built.
 GlacierFunction = Union[
     Callable[..., Any],
     Callable[..., Coroutine[Any, Any, Any]],
+    str,
 ]
 
 
@@ -49,42 +81,128 @@ GlacierUnit = Union[
 ]
 
 
-def get_enum_map(f: Callable[..., Any]) -> Dict[str, Dict[str, Any]]:
-    sig = signature(f)
+# Caches of the functions, which are released with the functions (e.g., made by the factory).
+_signatures: 'WeakKeyDictionary[Any, inspect.Signature]' = WeakKeyDictionary()
+_annotations: 'WeakKeyDictionary[Any, Dict[str, Any]]' = WeakKeyDictionary()
 
-    # pick enum from signature
-    enum_map: Dict[str, Dict[str, Any]] = {}
-    for param in sig.parameters.values():
-        if issubclass(param.annotation, Enum):
-            enum_class = param.annotation
-            enum_map.setdefault(param.name, {})
-            for enum_entry in enum_class:
-                enum_map[param.name][enum_entry.value] = enum_entry
-    return enum_map
+
+def _get_cached(cache: 'WeakKeyDictionary[Any, Any]', f: Callable[..., Any], compute: Callable[[Any], Any]) -> Any:
+    try:
+        return cache[f]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable (e.g., dataclass instance with `__call__`) or not weakly referenceable callable
+        return compute(f)
+    cache[f] = value = compute(f)
+    return value
+
+
+def get_signature(f: Callable[..., Any]) -> inspect.Signature:
+    signature_: inspect.Signature = _get_cached(_signatures, f, signature)
+    return signature_
+
+
+def get_annotations(f: Callable[..., Any]) -> Dict[str, Any]:
+    """
+    Return the annotations of the function, where the string annotations
+    (e.g., postponed by `from __future__ import annotations`) are resolved by `typing.get_type_hints`.
+    """
+    annotations: Dict[str, Any] = _get_cached(_annotations, f, _get_annotations)
+    return annotations
+
+
+def _get_annotations(f: Callable[..., Any]) -> Dict[str, Any]:
+    unwrapped = inspect.unwrap(f)
+    if not inspect.isroutine(unwrapped) and not isinstance(unwrapped, type):
+        # Callable instance, whose parameters are those of `__call__`.
+        unwrapped = f = getattr(type(unwrapped), '__call__')
+    annotations: Dict[str, Any] = getattr(unwrapped, '__annotations__', {})
+    if not any(isinstance(annotation, str) for annotation in annotations.values()):
+        return annotations
+    try:
+        return get_type_hints(f)
+    except Exception:
+        # Unresolvable forward reference, whose parameter is treated as unsupported type.
+        return annotations
+
+
+# Pairs of the parameter name and its converter.
+Converters = Tuple[Tuple[str, Callable[[Any], Any]], ...]
+
+
+def get_converters(
+    params: List['ParamSpec'],
+    handlers: Optional[Tuple[Optional['TypeHandler'], ...]] = None,
+) -> Converters:
+    """
+    Return the converters of the parameters whose value given by click is not the annotated type.
+    """
+    from glacier.type_handlers import resolve_type_handler
+
+    if handlers is None:
+        handlers = tuple(resolve_type_handler(param.annotation) for param in params)
+    return tuple(
+        (param.name, handler.converter)
+        for param, handler in zip(params, handlers)
+        if handler is not None and handler.converter is not None
+    )
+
+
+def _get_nargs(handler: Optional['TypeHandler']) -> int:
+    return 1 if handler is None else handler.nargs
 
 
 def glacier_wrap(
     f: Callable[..., Any],
-    enum_map: Dict[str, Dict[str, Any]],
+    converters: Converters,
 ) -> Callable[..., Any]:
     """
     Return the new function which is click-compatible
     (has no enum signature arguments) from the arbitrary glacier compatible
     function
+
+    The function itself is returned if there is nothing to convert.
     """
+    if not converters:
+        return f
 
     # Implemented the argument convert logic
     @functools.wraps(f)
     def wrapped(*args: Any, **kwargs: Any) -> Any:
-        # convert args and kwargs
-        converted_kwargs = {}
-        for name, value in kwargs.items():
-            if name in enum_map:
-                converted_kwargs[name] = enum_map[name][value]
-            else:
-                converted_kwargs[name] = value
+        _convert_kwargs(kwargs, converters)
+        return f(*args, **kwargs)
+
+    return wrapped
+
+
+def _convert_kwargs(kwargs: Dict[str, Any], converters: Converters) -> None:
+    # kwargs is owned by the call, so the values are converted in place.
+    for name, convert in converters:
+        value = kwargs.get(name)
+        if value is not None:
+            try:
+                kwargs[name] = convert(value)
+            except (KeyError, ValueError, ArithmeticError) as e:
+                raise click.BadParameter(str(e), param_hint=repr(name))
+
+
+def _get_coroutine_callback(
+    f: Callable[..., Any],
+    converters: Converters,
+    runner: Optional[AsyncRunner],
+) -> Callable[..., Any]:
+    """
+    Return the function which converts the arguments and runs the coroutine function,
+    without stacking the wrappers of `glacier_wrap` and `coro`.
+    """
+    if not converters:
+        return coro(f, runner)  # type: ignore
 
-        return f(*args, **converted_kwargs)
+    @functools.wraps(f)
+    def wrapped(*args: Any, **kwargs: Any) -> Any:
+        _convert_kwargs(kwargs, converters)
+        return (runner or get_default_runner()).run(f(*args, **kwargs))
 
     return wrapped
 
@@ -93,112 +211,553 @@ def _get_best_doc(docstring: str, arg_names: List[str]) -> Doc:
     """
     Detect the format of docstring and return best help generated from docstring.
     """
-    parser_types: List[Type[Parser]] = [
-        GoogleParser,
-        NumpyParser,
-        RestructuredTextParser,
-    ]
-    docs = [parser_type().parse(docstring=docstring) for parser_type in parser_types]
-    return max(docs, key=lambda doc: doc.get_matched_arg_count(arg_names))
+    return parse_docstring(docstring, arg_names)
 
 
-def _get_click_command(
-    f: Callable[..., Any],
-    click_group: Optional[click.Group] = None,
-) -> click.BaseCommand:
-    f = coro(f)
-
-    # Get signature
-    sig = signature(f)
-
-    # Get docstring
-    docstring = f.__doc__
-    if docstring:
-        doc = _get_best_doc(
-            docstring=docstring,
-            arg_names=[param.name for param in sig.parameters.values()],
+@dataclass(frozen=True)
+class ParamSpec:
+    """
+    Specification of the argument of function derived from its signature and docstring.
+    """
+
+    name: str
+    annotation: Any
+    required: bool
+    default: Any
+    help: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        # The default is not cached, since it may be taken from another module (e.g., `retries: int = RETRIES`).
+        return {
+            'name': self.name,
+            'help': self.help,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], annotations: Dict[str, Any], defaults: Dict[str, Any]) -> 'ParamSpec':
+        name = d['name']
+        return cls(
+            name=name,
+            annotation=annotations.get(name, Parameter.empty),
+            required=name not in defaults,
+            default=defaults.get(name),
+            help=d['help'],
         )
-        f.__doc__ = doc.description
-        arg_help_d = {arg.name: arg.description for arg in doc.args}
-    else:
-        arg_help_d = {}
 
-    # Precauclate Enum mappings
-    enum_map = get_enum_map(f)
 
-    # Return new function which interprets custom type such as Enum.
-    click_f: Any = glacier_wrap(f, enum_map)
+@dataclass(frozen=True)
+class FunctionSpec:
+    """
+    Specification of the command derived from the function.
+    """
+
+    description: Optional[str]
+    params: List[ParamSpec]
+
+    @classmethod
+    def of_function(cls, f: Callable[..., Any]) -> 'FunctionSpec':
+        # Get signature
+        sig = get_signature(f)
+        annotations = get_annotations(f)
+
+        # Get docstring
+        docstring = f.__doc__
+        if docstring:
+            doc = _get_best_doc(
+                docstring=docstring,
+                arg_names=[param.name for param in sig.parameters.values()],
+            )
+            description: Optional[str] = doc.description
+            arg_help_d = {arg.name: arg.description for arg in doc.args}
+        else:
+            description = None
+            arg_help_d = {}
+
+        return cls(
+            description=description,
+            params=[
+                ParamSpec(
+                    name=param.name,
+                    annotation=annotations.get(param.name, param.annotation),
+                    required=param.default == Parameter.empty,
+                    default=None if param.default == Parameter.empty else param.default,
+                    help=arg_help_d.get(param.name, ''),
+                )
+                for param in sig.parameters.values()
+            ],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'description': self.description,
+            'params': [param.to_dict() for param in self.params],
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], annotations: Dict[str, Any], defaults: Dict[str, Any]) -> 'FunctionSpec':
+        return cls(
+            description=d['description'],
+            params=[ParamSpec.from_dict(param, annotations, defaults) for param in d['params']],
+        )
+
+
+@dataclass(frozen=True)
+class BuildOptions:
+    """
+    Options shared by all the commands built from the functions.
+    """
+
+    spec_cache: Optional[SpecCache] = None
+    runner: Optional[AsyncRunner] = None
+    fan_out: bool = False
+    stream_format: str = 'line'
+    output_format: Optional[str] = None
+    middlewares: Tuple['Middleware', ...] = ()
+
+
+DEFAULT_BUILD_OPTIONS = BuildOptions()
+
+
+def _get_function_spec(f: Callable[..., Any], spec_cache: Optional[SpecCache]) -> FunctionSpec:
+    """
+    Return the specification of the function, from the cache if available.
+    """
+    if spec_cache is None:
+        return FunctionSpec.of_function(f)
+
+    cached = spec_cache.get(f)
+    if cached is not None:
+        try:
+            return FunctionSpec.from_dict(cached, get_annotations(f), _get_defaults(f))
+        except (KeyError, TypeError, ValueError):
+            pass
+    spec = FunctionSpec.of_function(f)
+    spec_cache.set(f, spec.to_dict())
+    return spec
 
-    # Decorate the function reversely.
-    for param in reversed(list(sig.parameters.values())):
+
+def _get_defaults(f: Callable[..., Any]) -> Dict[str, Any]:
+    """
+    Return the default values of the parameters read from the function itself,
+    which is cheaper than its signature.
+    """
+    unwrapped = inspect.unwrap(f)
+    code = unwrapped.__code__
+    positional_names = code.co_varnames[: code.co_argcount]
+    positional_defaults = unwrapped.__defaults__ or ()
+    defaults = dict(zip(positional_names[len(positional_names) - len(positional_defaults) :], positional_defaults))
+    defaults.update(unwrapped.__kwdefaults__ or {})
+    return defaults
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+    """
+    Everything derived from the registered function for its command,
+    which is computed once and consumed by every stage of building the command.
+
+    `callback` is the click callback, which converts the arguments
+    (and runs the coroutine for async function) in one frame,
+    and `async_callback` is its coroutine function version used by the async fan-out.
+    """
+
+    __slots__ = ('name', 'spec', 'handlers', 'concurrency', 'streaming', 'output_format', 'callback', 'async_callback')
+
+    name: str
+    spec: FunctionSpec
+    # Handler of each parameter of `spec`, which is None for unsupported type.
+    handlers: Tuple[Optional['TypeHandler'], ...]
+    concurrency: Optional[Concurrency]
+    streaming: bool
+    output_format: Optional[str]
+    callback: Callable[..., Any]
+    async_callback: Optional[Callable[..., Any]]
+
+    @classmethod
+    def of_function(
+        cls,
+        f: Callable[..., Any],
+        name: Optional[str] = None,
+        options: BuildOptions = DEFAULT_BUILD_OPTIONS,
+    ) -> 'CommandSpec':
+        from glacier.profiling import get_profiler, phase
+        from glacier.stream import get_streaming_function, is_streaming_function
+        from glacier.type_handlers import resolve_type_handler
+
+        function_name = _get_function_name(f)
+        with phase(f'docstring {function_name}'):
+            spec = _get_function_spec(f, options.spec_cache)
+        handlers = tuple(resolve_type_handler(param.annotation) for param in spec.params)
+        converters = get_converters(spec.params, handlers)
+
+        streaming = is_streaming_function(f)
+        if streaming:
+            # The yielded items are written instead of returning the generator.
+            f = get_streaming_function(f, options.stream_format)
+
+        profiler = get_profiler()
+        if profiler is not None:
+            # Wrapped only while profiling, so that the calls are not slowed down otherwise.
+            converters = tuple(
+                (param_name, profiler.wrap(convert, f'convert {param_name}')) for param_name, convert in converters
+            )
+            f = profiler.wrap(f, f'function {function_name}')
+
+        command_name = _get_command_name(name or function_name)
+        if options.middlewares:
+            from glacier.middleware import apply_middlewares
+
+            f = apply_middlewares(f, command_name, options.middlewares, options.runner)
+
+        concurrency = get_concurrency(f)
+        async_callback: Optional[Callable[..., Any]] = None
+        if concurrency is not None:
+            # Each value of the parameter is interpreted by the function called concurrently.
+            async_callback = get_concurrent_function(glacier_wrap(f, converters), concurrency)
+            callback = coro(async_callback, options.runner)
+        elif inspect.iscoroutinefunction(f):
+            async_callback = glacier_wrap(f, converters)
+            callback = _get_coroutine_callback(f, converters, options.runner)
+        else:
+            # Return new function which interprets custom type such as Enum.
+            callback = glacier_wrap(f, converters)
+
+        output_format = None if streaming else options.output_format
+        if output_format is not None:
+            from glacier.output import get_rendering_function
+
+            callback = get_rendering_function(callback, output_format)
+
+        return cls(
+            name=command_name,
+            spec=spec,
+            handlers=handlers,
+            concurrency=concurrency,
+            streaming=streaming,
+            output_format=output_format,
+            callback=callback,
+            async_callback=async_callback,
+        )
+
+
+def _get_click_params(command_spec: CommandSpec, fan_out: bool) -> List[click.Parameter]:
+    # Parameters of fan-out command can be given by the parameter sets instead of the command line.
+    argument_cls: Any = click.Argument
+    option_cls: Any = click.Option
+    if fan_out:
+        from glacier.fanout import FanOutArgument, FanOutOption
+
+        argument_cls, option_cls = FanOutArgument, FanOutOption
+    concurrency = command_spec.concurrency
+
+    params: List[click.Parameter] = []
+    for param, handler in zip(command_spec.spec.params, command_spec.handlers):
+        multiple = concurrency is not None and param.name == concurrency.over
         if param.name.startswith('_'):
             # Positional argument
-            click_f = click.argument(
-                param.name,
-                type=param.annotation,
-                nargs=1,
-            )(click_f)
-        else:
+            params.append(
+                argument_cls(
+                    [param.name],
+                    type=param.annotation if handler is None else handler.click_type,
+                    nargs=-1 if multiple or (handler is not None and handler.multiple) else _get_nargs(handler),
+                    required=True,
+                )
+            )
+        elif handler is not None:
             # Optional argument
-            if param.default == Parameter.empty:
-                common_kwargs = dict(
+            if param.required:
+                common_kwargs: Dict[str, Any] = dict(
                     required=True,
-                    help=arg_help_d.get(param.name, ''),
+                    help=param.help,
                 )
             else:
+                # Enum default is given by its value, which click accepts.
+                default = param.default.value if isinstance(param.default, Enum) else param.default
                 common_kwargs = dict(
-                    default=param.default,
-                    help=arg_help_d.get(param.name, ''),
+                    default=(() if default is None else (default,)) if multiple else default,
+                    help=param.help,
+                )
+            params.append(
+                option_cls(
+                    ['--' + param.name.replace('_', '-')],
+                    type=handler.click_type,
+                    is_flag=handler.is_flag,
+                    multiple=multiple or handler.multiple,
+                    nargs=handler.nargs,
+                    **common_kwargs,
                 )
-            if param.annotation == bool:
-                # Boolean flag
-                click_f = click.option(
-                    '--' + param.name.replace('_', '-'),
-                    is_flag=True,
-                    type=bool,
-                    **common_kwargs,  # type: ignore
-                )(click_f)
-            elif param.annotation == str or param.annotation == int:
-                # string or boolean option
-                click_f = click.option(  # type: ignore
-                    '--' + param.name.replace('_', '-'),
-                    type=param.annotation,
-                    **common_kwargs,  # type: ignore
-                )(click_f)
-            elif issubclass(param.annotation, Enum):
-                click_f = click.option(  # type: ignore
-                    '--' + param.name.replace('_', '-'),
-                    type=click.Choice(list(enum_map[param.name].keys())),
-                    **common_kwargs,  # type: ignore
-                )(click_f)
+            )
+    return params
 
+
+def _get_click_command(
+    f: Callable[..., Any],
+    click_group: Optional[click.Group] = None,
+    options: BuildOptions = DEFAULT_BUILD_OPTIONS,
+    name: Optional[str] = None,
+) -> click.Command:
+    from glacier.profiling import phase
+
+    with phase(f'build {name or _get_function_name(f)}'):
+        return _build_click_command(f, click_group, options, name)
+
+
+def _build_click_command(
+    f: Callable[..., Any],
+    click_group: Optional[click.Group],
+    options: BuildOptions,
+    name: Optional[str],
+) -> click.Command:
+    command_spec = CommandSpec.of_function(f, name, options)
+
+    command_cls = _get_fan_out_command_cls() if options.fan_out else GlacierCommand
+    command = command_cls(
+        name=command_spec.name,
+        callback=command_spec.callback,
+        params=_get_click_params(command_spec, options.fan_out),
+        context_settings=CONTEXT_SETTINGS,
+        help=command_spec.spec.description,
+        **DEFAULT_COLOR_OPTIONS,  # type: ignore
+    )
+    if command_spec.streaming:
+        from glacier.stream import get_stream_format_option
+
+        _add_glacier_options(command, [get_stream_format_option(options.stream_format)])
+    if command_spec.output_format is not None:
+        from glacier.output import get_output_option
+
+        _add_glacier_options(command, [get_output_option(command_spec.output_format)])
+    if options.fan_out:
+        from glacier.fanout import get_fan_out_options
+
+        _add_glacier_options(command, get_fan_out_options())
+        command.async_callback = command_spec.async_callback  # type: ignore
+        command.runner = options.runner  # type: ignore
     if click_group:
-        return click_group.command(
-            cls=HelpColorsCommand,
-            context_settings=CONTEXT_SETTINGS,
-            **DEFAULT_COLOR_OPTIONS,  # type: ignore
-        )(click_f)
-    else:
-        return click.command(  # type: ignore
-            cls=HelpColorsCommand,
-            context_settings=CONTEXT_SETTINGS,
-            **DEFAULT_COLOR_OPTIONS,  # type: ignore
-        )(click_f)
+        click_group.add_command(command)
+    return command
 
 
-def rename(
-    f: Callable[..., T],
-    name: str,
-) -> Callable[..., T]:
-    @functools.wraps(f)
-    def wrapped(*args: Any, **kwargs: Any) -> T:
-        return f(*args, **kwargs)
+def _add_glacier_options(command: click.Command, glacier_options: Sequence[click.Parameter]) -> None:
+    """
+    Add the options of glacier (e.g., `--output`) to the command,
+    which must not collide with the options derived from the function.
+    """
+    taken = {opt for param in command.params for opt in [*param.opts, *param.secondary_opts]}
+    for option in glacier_options:
+        collisions = taken.intersection(option.opts)
+        if collisions:
+            raise ValueError(
+                f'{", ".join(sorted(collisions))} of the command {command.name} collides with the option of glacier.'
+            )
+    command.params.extend(glacier_options)
+
+
+@functools.lru_cache(maxsize=None)
+def _strips_name_suffix() -> bool:
+    """
+    Return True if click (>= 8.2) strips the suffix (e.g., `_command`) from the function name.
+    """
+
+    def probe_command() -> None:
+        pass
+
+    return click.command()(probe_command).name == 'probe'
+
+
+def _get_function_name(f: Callable[..., Any]) -> str:
+    # Callable instance (e.g., dataclass with `__call__`) is named by its class.
+    name: str = getattr(f, '__name__', None) or type(f).__name__
+    return name
+
+
+def _get_command_name(name: str) -> str:
+    """
+    Return the subcommand name click derives from the function name.
+    """
+    command_name = name.lower().replace('_', '-')
+    left, sep, suffix = command_name.rpartition('-')
+    if sep and suffix in ('command', 'cmd', 'group', 'grp') and _strips_name_suffix():
+        return left
+    return command_name
+
+
+def _get_short_help(docstring: Optional[str]) -> str:
+    """
+    Return the first paragraph of the docstring without parsing it,
+    which is enough for the command listing of the group help.
+    """
+    if not docstring:
+        return ''
+    lines = []
+    for line in docstring.strip().splitlines():
+        line = line.strip()
+        if not line or line in ('Args:', 'Parameters') or line.startswith(':'):
+            break
+        lines.append(line)
+    return ' '.join(lines)
+
+
+@dataclass(frozen=True)
+class LazyCommand:
+    factory: CommandFactory
+    short_help: str
+    hidden: bool = False
+
+    def get_short_help_str(self, limit: int) -> str:
+        # Shorten the help in the same way as click.Command
+        return click.Command(None, help=self.short_help).get_short_help_str(limit)
 
-    wrapped.__name__ = name
-    return wrapped
+
+class ColorHelpMixin:
+    """
+    Colorize the help like `click_help_colors.HelpColorsMixin`,
+    which is imported only when the help is actually displayed.
+    """
+
+    def __init__(
+        self,
+        help_headers_color: Optional[str] = None,
+        help_options_color: Optional[str] = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        self.help_headers_color = help_headers_color
+        self.help_options_color = help_options_color
+        # On-disk cache of the help of the whole CLI, which is set to the root command.
+        self.help_cache: Optional['HelpCache'] = None
+        self._helps: Dict[Tuple[str, int], str] = {}
+        super().__init__(*args, **kwargs)
+
+    def get_help(self, ctx: click.Context) -> str:
+        """
+        Return the help, which is rendered once per command path and width.
+        """
+        from glacier.help import get_help_width
+
+        width = get_help_width(ctx)
+        key = (ctx.command_path, width)
+        if key not in self._helps:
+            self._helps[key] = self._render_help(ctx)
+            help_cache = getattr(ctx.find_root().command, 'help_cache', None)
+            if help_cache is not None:
+                help_cache.set(ctx.command_path, width, self._helps[key])
+        return self._helps[key]
+
+    def _render_help(self, ctx: click.Context) -> str:
+        from click_help_colors import HelpColorsFormatter
+
+        formatter = HelpColorsFormatter(
+            width=ctx.terminal_width,
+            max_width=ctx.max_content_width,
+            headers_color=self.help_headers_color,
+            options_color=self.help_options_color,
+        )
+        self.format_help(ctx, formatter)  # type: ignore
+        return formatter.getvalue().rstrip('\n')
+
+
+class ProfileMixin:
+    """
+    Record the argument parsing by click as the phase of the profile.
+    """
+
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        from glacier.profiling import phase
+
+        with phase(f'parse {ctx.command_path}'):
+            return super().parse_args(ctx, args)  # type: ignore
+
+
+class GlacierCommand(ProfileMixin, ColorHelpMixin, click.Command):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def _get_fan_out_command_cls() -> Type[GlacierCommand]:
+    from glacier.fanout import FanOutCommandMixin
+
+    class FanOutCommand(FanOutCommandMixin, GlacierCommand):
+        pass
+
+    return FanOutCommand
+
+
+class LazyGroup(ProfileMixin, ColorHelpMixin, click.Group):
+    """
+    click group which builds its subcommands on the first lookup.
+
+    Only the names and the short help are kept until a subcommand is
+    actually resolved, so that invoking one subcommand does not pay
+    for constructing all the others.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_commands: Dict[str, LazyCommand] = {}
+
+    def add_lazy_command(
+        self,
+        name: str,
+        factory: CommandFactory,
+        short_help: str = '',
+        hidden: bool = False,
+    ) -> None:
+        self.lazy_commands[name] = LazyCommand(factory, short_help, hidden)
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted({*self.commands, *self.lazy_commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.commands:
+            return self.commands[cmd_name]
+        lazy_command = self.lazy_commands.get(cmd_name)
+        if lazy_command is None:
+            return None
+        # The entry is kept until the build succeeds so that a failed build can be retried.
+        command = lazy_command.factory()
+        self.add_command(command, cmd_name)
+        del self.lazy_commands[cmd_name]
+        return command
+
+    def resolve_command(
+        self, ctx: click.Context, args: List[str]
+    ) -> Tuple[Optional[str], Optional[click.Command], List[str]]:
+        # click suggests only from the built commands (click >= 8.4).
+        no_such_command = getattr(click.exceptions, 'NoSuchCommand', None)
+        try:
+            return super().resolve_command(ctx, args)
+        except click.UsageError as e:
+            if no_such_command is None or not isinstance(e, no_such_command):
+                raise
+            raise no_such_command(e.command_name, possibilities=self.list_commands(ctx), ctx=ctx) from None
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        cmd_names = [
+            cmd_name
+            for cmd_name in self.list_commands(ctx)
+            if not (self.commands[cmd_name] if cmd_name in self.commands else self.lazy_commands[cmd_name]).hidden
+        ]
+        if not cmd_names:
+            return
+
+        # allow for 3 times the default spacing (same as click.Group)
+        limit = formatter.width - 6 - max(len(cmd_name) for cmd_name in cmd_names)
+        rows = []
+        for cmd_name in cmd_names:
+            if cmd_name in self.commands:
+                rows.append((cmd_name, self.commands[cmd_name].get_short_help_str(limit)))
+            else:
+                rows.append((cmd_name, self.lazy_commands[cmd_name].get_short_help_str(limit)))
+        with formatter.section('Commands'):
+            formatter.write_dl(rows)
+
+
+SHOW_COMPLETION_HELP = 'Show the click-completion-command completion code'
 
 
-if loads_completion:
+def _get_show_completion_command() -> click.Command:
+    import click_completion
 
     @click.option(
         '-i',
@@ -211,10 +770,87 @@ if loads_completion:
         type=click_completion.DocumentedChoice(click_completion.core.shells),
     )
     def show_completion(shell: str, case_insensitive: bool) -> None:
-        """Show the click-completion-command completion code"""
         extra_env = {'_CLICK_COMPLETION_COMMAND_CASE_INSENSITIVE_COMPLETE': 'ON'} if case_insensitive else {}
         click.echo(click_completion.core.get_code(shell, extra_env=extra_env))
 
+    return click.command(  # type: ignore
+        cls=GlacierCommand,
+        context_settings=CONTEXT_SETTINGS,
+        help=SHOW_COMPLETION_HELP,
+        **DEFAULT_COLOR_OPTIONS,  # type: ignore
+    )(show_completion)
+
+
+COMPLETION_SCRIPT_HELP = 'Show the static completion script, which completes without running Python'
+
+
+def _get_completion_script_command() -> click.Command:
+    from glacier.static_completion import STATIC_COMPLETION_SHELLS
+
+    @click.option(
+        '--prog-name',
+        help='Name of the command to complete (the name invoked by default)',
+    )
+    @click.argument('shell', type=click.Choice(STATIC_COMPLETION_SHELLS))
+    def completion_script(shell: str, prog_name: Optional[str]) -> None:
+        from glacier.completion import get_command_node
+        from glacier.static_completion import get_completion_script
+
+        root = click.get_current_context().find_root()
+        click.echo(get_completion_script(get_command_node(root.command), prog_name or root.info_name or '', shell))
+
+    return click.command(  # type: ignore
+        cls=GlacierCommand,
+        context_settings=CONTEXT_SETTINGS,
+        help=COMPLETION_SCRIPT_HELP,
+        hidden=True,
+        **DEFAULT_COLOR_OPTIONS,  # type: ignore
+    )(completion_script)
+
+
+def _is_completion_requested() -> bool:
+    """
+    Return True if the shell completion (`_<PROG>_COMPLETE`) is requested.
+    """
+    return any(key.startswith('_') and key.endswith('_COMPLETE') for key in os.environ)
+
+
+def _is_help_requested() -> bool:
+    help_option_names: List[str] = CONTEXT_SETTINGS['help_option_names']  # type: ignore
+    return any(arg in help_option_names for arg in sys.argv[1:])
+
+
+def _add_lazy_function(
+    group: LazyGroup,
+    f: GlacierFunction,
+    name: Optional[str] = None,
+    options: BuildOptions = DEFAULT_BUILD_OPTIONS,
+) -> None:
+    """
+    Register the function to the group without building its command.
+    """
+    if isinstance(f, str):
+        docstring = get_import_path_docstring(f)
+        command_name = name or f.rpartition(':')[2].rpartition('.')[2]
+    else:
+        docstring = f.__doc__
+        command_name = name or _get_function_name(f)
+    group.add_lazy_command(
+        _get_command_name(command_name),
+        functools.partial(_get_lazy_click_command, f, name, options),
+        _get_short_help(docstring),
+    )
+
+
+def _get_lazy_click_command(
+    f: GlacierFunction,
+    name: Optional[str],
+    options: BuildOptions,
+) -> click.Command:
+    if isinstance(f, str):
+        f = import_string(f)
+    return _get_click_command(f, options=options, name=name)  # type: ignore
+
 
 def glacier_group(
     f: Union[
@@ -223,23 +859,26 @@ def glacier_group(
     ],
     parent_group: Optional[click.Group] = None,
     group_name: Optional[str] = None,
+    options: BuildOptions = DEFAULT_BUILD_OPTIONS,
+    batch: bool = False,
+    is_root: bool = True,
 ) -> click.Group:
     """
     Make click group
+
+    Subcommands are registered lazily, and are built only when
+    they are looked up (i.e., invoked or displaying its own help).
+    If `batch` is True, `--batch` option is added to execute the command lines
+    read from stdin within this process.
+    The commands of the shell completion are added only to the root group (`is_root`).
     """
-    if parent_group is None:
-        group_cls: Any = click  # type: ignore
-    else:
-        group_cls = parent_group
 
     def dummy_group() -> None:
         pass
 
-    if group_name:
-        dummy_group = rename(dummy_group, group_name)
-
-    group = group_cls.group(  # type: ignore
-        cls=HelpColorsGroup,
+    group: LazyGroup = click.group(  # type: ignore
+        _get_command_name(group_name) if group_name else None,
+        cls=LazyGroup,
         context_settings=CONTEXT_SETTINGS,
         **DEFAULT_COLOR_OPTIONS,
     )(dummy_group)
@@ -249,48 +888,306 @@ def glacier_group(
         # The declared name of functions are used as subcommand
 
         for _f in f:
-            _get_click_command(coro(_f), group)
+            _add_lazy_function(group, _f, options=options)
 
     elif isinstance(f, dict):
         # Dictionary of functions with custom subcommand name as key
         for name, _f in f.items():  # type: ignore
-            if callable(_f):
-                _get_click_command(rename(coro(_f), name), group)
+            if callable(_f) or isinstance(_f, str):
+                _add_lazy_function(group, _f, name, options)
             else:
-                glacier_group(
-                    _f,  # type: ignore
-                    group,
-                    name,
+                group.add_lazy_command(
+                    _get_command_name(name),
+                    functools.partial(glacier_group, _f, None, name, options, is_root=False),  # type: ignore
                 )
     else:
         raise Exception('The arguments of glacier is wrong.')
 
-    if parent_group is None and loads_completion:
-        group.command(  # type: ignore
-            cls=HelpColorsCommand,
-            context_settings=CONTEXT_SETTINGS,
-            **DEFAULT_COLOR_OPTIONS,  # type: ignore
-        )(show_completion)
+    if parent_group is not None:
+        parent_group.add_command(group)
+    elif is_root:
+        if loads_completion:
+            group.add_lazy_command(
+                'show-completion',
+                _get_show_completion_command,
+                SHOW_COMPLETION_HELP,
+            )
+        if 'completion-script' not in group.lazy_commands:
+            group.add_lazy_command(
+                'completion-script',
+                _get_completion_script_command,
+                COMPLETION_SCRIPT_HELP,
+                hidden=True,
+            )
+    if batch:
+        from glacier.batch import get_batch_option
+
+        _add_glacier_options(group, [get_batch_option()])
 
     return group  # type: ignore
 
 
+def _collect_source_paths(
+    f: Union[
+        GlacierFunction,
+        List[GlacierFunction],
+        Dict[str, Union[GlacierFunction, GlacierUnit]],
+    ],
+) -> List[str]:
+    """
+    Return the source files of all the functions registered.
+    """
+    if isinstance(f, list):
+        return [path for _f in f for path in _collect_source_paths(_f)]
+    if isinstance(f, dict):
+        return [path for _f in f.values() for path in _collect_source_paths(_f)]  # type: ignore
+    if isinstance(f, str):
+        # Located without importing the module.
+        path = get_import_path_source(f)
+    else:
+        path = get_source_path(f)  # type: ignore
+    return [path] if path else []
+
+
+def _get_cli_sources(
+    f: Union[
+        GlacierFunction,
+        List[GlacierFunction],
+        Dict[str, Union[GlacierFunction, GlacierUnit]],
+    ],
+    caller_source: Optional[str] = None,
+) -> List[str]:
+    """
+    Return the files invalidating what is cached for the whole CLI: the script, the module calling `glacier()`
+    (e.g., imported by the script of console_scripts), and the source files of the functions.
+    """
+    paths = [os.path.abspath(sys.argv[0])]
+    if caller_source is not None:
+        paths.append(os.path.abspath(caller_source))
+    return list(dict.fromkeys([*paths, *_collect_source_paths(f)]))
+
+
+def _get_registration_tree(
+    f: Union[
+        GlacierFunction,
+        List[GlacierFunction],
+        Dict[str, Union[GlacierFunction, GlacierUnit]],
+    ],
+) -> Any:
+    if isinstance(f, list):
+        return [_get_registration_tree(_f) for _f in f]
+    if isinstance(f, dict):
+        return {name: _get_registration_tree(_f) for name, _f in f.items()}  # type: ignore
+    if isinstance(f, str):
+        return f
+    return '{}:{}'.format(getattr(f, '__module__', ''), getattr(f, '__qualname__', type(f).__qualname__))
+
+
+def _get_registration_key(
+    f: Union[
+        GlacierFunction,
+        List[GlacierFunction],
+        Dict[str, Union[GlacierFunction, GlacierUnit]],
+    ],
+    **options: Any,
+) -> str:
+    """
+    Return the digest of the registration of the CLI (the names of the commands and the functions,
+    and the options of `glacier()`), which invalidates what is cached for the whole CLI as well as the sources.
+    """
+    import hashlib
+    import json
+
+    registration = json.dumps([_get_registration_tree(f), options], sort_keys=True)
+    return hashlib.sha1(registration.encode()).hexdigest()
+
+
+def _start_profiler(output: Optional[str]) -> None:
+    """
+    Start the profiler reporting when the process exits, from the import of glacier.
+    """
+    import atexit
+
+    import glacier as package
+    from glacier.profiling import start_profiler, stop_profiler
+
+    profiler = start_profiler(output, package._import_started)
+    profiler.add('import glacier', package._import_started, package._import_finished)
+    atexit.register(stop_profiler)
+
+
 def glacier(
     f: Union[
         GlacierFunction,
         List[GlacierFunction],
         Dict[str, Union[GlacierFunction, GlacierUnit]],
     ],
+    cache: bool = True,
+    runner: Optional[AsyncRunner] = None,
+    batch: bool = False,
+    daemon: bool = False,
+    daemon_idle_timeout: float = 600.0,
+    fan_out: bool = False,
+    stream_format: str = 'line',
+    output: Optional[str] = None,
+    middlewares: Sequence['Middleware'] = (),
 ) -> None:
     """
     Main function making function to command line entrypoint
+
+    If `cache` is True, the specification derived from each function
+    (signature and parsed docstring) is cached on disk, and reused while
+    its source file is unchanged. The cache directory can be relocated by
+    `GLACIER_CACHE_DIR`, and disabled by `GLACIER_NO_CACHE` environment variable.
+
+    Async functions are run by `runner`, which owns one event loop
+    shared by all the commands (the default runner is used if omitted).
+
+    If `batch` is True, `--batch` option is added to execute the command lines
+    read from stdin (e.g., `mytool --batch < commands.txt`) within one process.
+
+    If `daemon` is True, the first invocation starts a background daemon
+    keeping the built commands and imported modules warm, and the following
+    invocations are forwarded to it (see also `python -m glacier.client`).
+    The daemon exits after `daemon_idle_timeout` seconds without invocation,
+    or when the source files of the registered functions are modified.
+
+    If `fan_out` is True, `--fan-out FILE` option is added to each command
+    to execute it for every parameter set read from the JSON lines (or CSV) file,
+    on a thread pool, a process pool, or the event loop of `runner` (see `glacier.fanout`).
+
+    Generator (and async generator) functions write each yielded item to stdout
+    as soon as it is produced, formatted by `stream_format` (line, jsonl, csv, or the format
+    registered by `glacier.stream.register_stream_format`), which can be overridden by `--stream-format`.
+
+    If `output` is given (json, jsonl, csv, or table), the non-None return value of each command
+    is written in the format, which can be overridden by `--output`.
+
+    The hooks of `middlewares` (`glacier.middleware.Middleware`) are called before and after
+    each call of the functions, or when it raises (e.g., `glacier.metrics.StatsDMiddleware`
+    and `glacier.metrics.PrometheusTextfileMiddleware` emit the latency and the exit code).
+    The functions are not wrapped if no hook is registered.
+
+    The phases of the invocation (import, build, docstring parsing, argument parsing, conversion,
+    and the function) are reported to stderr by `--glacier-profile` option given anywhere
+    (or `GLACIER_PROFILE` environment variable), and written as the cProfile statistics or
+    the Chrome trace by `--glacier-profile-output` (or `GLACIER_PROFILE_OUTPUT`, see `glacier.profiling`).
+
+    The help of each command is rendered once, and cached on disk (with `cache`)
+    to be written without building the commands (see `glacier.help`).
+
+    The shell completion is answered from the index of the command tree cached on disk
+    (with `cache`) without building the commands, unless it is dynamic (see `glacier.completion`).
     """
+    from glacier.profiling import get_profile_request, phase, strip_profile_options
+
+    # Module registering the functions, which may differ from the script (e.g., console_scripts).
+    caller_source: Optional[str] = sys._getframe(1).f_globals.get('__file__')
+
+    profiling, profile_output = get_profile_request(sys.argv[1:])
+    # Arguments given to click, which are read from sys.argv by click if None.
+    args: Optional[List[str]] = None
+    if profiling:
+        _start_profiler(profile_output)
+        args = strip_profile_options(sys.argv[1:])
+
+    help_cache = None
+    cache_dir = get_default_cache_dir() if cache else None
+    if cache_dir is not None and _is_help_requested():
+        from glacier.help import HelpCache, get_help_cache_path
+
+        help_cache = HelpCache(
+            get_help_cache_path(cache_dir, sys.argv[0]),
+            _get_cli_sources(f, caller_source),
+            _get_registration_key(f, batch=batch, fan_out=fan_out, stream_format=stream_format, output=output),
+        )
+        cached_help = help_cache.lookup(
+            get_prog_name(),
+            sys.argv[1:],
+            CONTEXT_SETTINGS['help_option_names'],  # type: ignore
+            CONTEXT_SETTINGS['max_content_width'],  # type: ignore
+        )
+        if cached_help is not None:
+            click.echo(cached_help)
+            sys.exit(0)
+
+    # Path of the completion index to be (re)written after building the commands
+    completion_index_path = None
+    if _is_completion_requested():
+        from glacier.completion import (
+            complete_from_index,
+            get_completion_index_path,
+            get_completion_request,
+            load_completion_index,
+        )
+
+        completion_request = get_completion_request()
+        registration = _get_registration_key(
+            f, batch=batch, fan_out=fan_out, stream_format=stream_format, output=output
+        )
+        if completion_request is not None and cache_dir is not None:
+            index_path = get_completion_index_path(cache_dir, sys.argv[0])
+            root = load_completion_index(index_path, _get_cli_sources(f, caller_source), registration)
+            if root is None:
+                completion_index_path = index_path
+            else:
+                exit_code = complete_from_index(root, *completion_request)
+                if exit_code is not None:
+                    sys.exit(exit_code)
+
+    if daemon:
+        from glacier.client import forward, get_socket_path, is_daemon_supported
+
+        # The invocation is profiled in this process instead of the daemon.
+        daemon = is_daemon_supported() and not profiling
+    if daemon:
+        socket_path = get_socket_path(sys.argv[0])
+        exit_code = forward(socket_path, sys.argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    options = BuildOptions(
+        spec_cache=get_default_spec_cache() if cache else None,
+        runner=runner,
+        fan_out=fan_out,
+        stream_format=stream_format,
+        output_format=output,
+        middlewares=tuple(middlewares),
+    )
+
+    with phase('build'):
+        if isinstance(f, str):
+            f = import_string(f)
+        if callable(f):
+            # Only one function is passed.
+            entry_point_f = _get_click_command(f, options=options)
+            if batch:
+                from glacier.batch import get_batch_option
+
+                _add_glacier_options(entry_point_f, [get_batch_option()])
+        else:
+            entry_point_f = glacier_group(f, options=options, batch=batch)  # type: ignore
+    entry_point_f.help_cache = help_cache  # type: ignore
+    if loads_completion and _is_completion_requested():
+        import click_completion
 
-    if callable(f):
-        # Only one function is passed.
-        entry_point_f = _get_click_command(f)
-    else:
-        entry_point_f = glacier_group(f)  # type: ignore
-    if loads_completion:
         click_completion.init()
-    entry_point_f()
+    if completion_index_path is not None:
+        from glacier.completion import write_completion_index
+
+        write_completion_index(
+            completion_index_path,
+            entry_point_f,  # type: ignore
+            _get_cli_sources(f, caller_source),
+            registration,
+        )
+    if daemon:
+        from glacier.daemon import start_daemon
+
+        start_daemon(
+            entry_point_f,  # type: ignore
+            socket_path,
+            lambda: _get_cli_sources(f, caller_source),
+            daemon_idle_timeout,
+        )
+    entry_point_f(args=args)
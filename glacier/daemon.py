@@ -0,0 +1,209 @@
+"""
+Daemon which keeps the built command (and the imported modules) warm.
+
+The daemon listens on a per-user Unix domain socket, and forks a child for each
+invocation forwarded by `glacier.client.forward`. The child takes over the
+stdin/stdout/stderr of the client, so the output is streamed directly.
+The daemon exits after `idle_timeout` seconds without invocation, or when any of
+the source files is modified (the client then runs the command by itself).
+"""
+
+import json
+import os
+import socket
+import sys
+import traceback
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import click
+
+from glacier.cache import get_source_stamps
+from glacier.client import get_peer_uid, get_socket_dir, is_owned_privately, send_message
+
+DEFAULT_IDLE_TIMEOUT = 600.0
+
+
+def ensure_socket_dir() -> str:
+    """
+    Create the socket directory which only the current user can access.
+    """
+    socket_dir = get_socket_dir()
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    if not is_owned_privately(socket_dir):
+        raise PermissionError(f'{socket_dir} must be owned and only accessible by the current user.')
+    return socket_dir
+
+
+def build_all(command: click.Command) -> None:
+    """
+    Build all the (lazy) subcommands recursively.
+    """
+    if not isinstance(command, click.Group):
+        return
+    ctx = click.Context(command)
+    for cmd_name in command.list_commands(ctx):
+        subcommand = command.get_command(ctx, cmd_name)
+        if subcommand is not None:
+            build_all(subcommand)
+
+
+def _receive_request(conn: socket.socket) -> Tuple[Dict[str, Any], List[int]]:
+    data, fds, _, _ = socket.recv_fds(conn, 1 << 16, 3)
+    while not data.endswith(b'\n'):
+        chunk = conn.recv(1 << 16)
+        if not chunk:
+            break
+        data += chunk
+    return json.loads(data), fds
+
+
+def _run_request(command: click.Command, request: Dict[str, Any], fds: List[int], conn: socket.socket) -> None:
+    """
+    Run the command in the forked child, and never return.
+    """
+    exit_code: Any = 1
+    try:
+        for target_fd, fd in enumerate(fds):
+            os.dup2(fd, target_fd)
+            os.close(fd)
+        # Rebind the standard streams to the descriptors taken over from the client.
+        sys.stdin = open(0, 'r', closefd=False)
+        sys.stdout = open(1, 'w', buffering=1 if os.isatty(1) else -1, closefd=False)
+        sys.stderr = open(2, 'w', buffering=1, closefd=False)
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        argv = request['argv']
+        sys.argv = list(argv)
+        send_message(conn, {'pid': os.getpid()})
+        try:
+            command.main(args=argv[1:], prog_name=os.path.basename(argv[0]))
+            exit_code = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                exit_code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        send_message(conn, {'exit': exit_code})
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        os._exit(0)
+
+
+def _reap_children() -> None:
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0] > 0:
+            pass
+    except ChildProcessError:
+        pass
+
+
+def serve(
+    command: click.Command,
+    socket_path: str,
+    sources: Iterable[str],
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+) -> None:
+    """
+    Serve the invocations forwarded to the socket until it becomes idle or stale.
+    """
+    # Publish the socket only after it starts listening, and never replace
+    # the socket of another daemon.
+    tmp_socket_path = f'{socket_path}.{os.getpid()}'
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(tmp_socket_path)
+        listener.listen()
+        os.link(tmp_socket_path, socket_path)
+    except OSError:
+        listener.close()
+        return
+    finally:
+        if os.path.exists(tmp_socket_path):
+            os.unlink(tmp_socket_path)
+    socket_stat = os.stat(socket_path)
+    stamps = get_source_stamps(sources)
+    try:
+        listener.settimeout(idle_timeout)
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                break
+            with conn:
+                peer_uid = get_peer_uid(conn)
+                if peer_uid is not None and peer_uid != os.getuid():
+                    continue
+                conn.settimeout(None)
+                request, fds = _receive_request(conn)
+                if get_source_stamps(stamps) != stamps:
+                    for fd in fds:
+                        os.close(fd)
+                    send_message(conn, {'status': 'stale'})
+                    break
+                if os.fork() == 0:
+                    listener.close()
+                    _run_request(command, request, fds, conn)
+                for fd in fds:
+                    os.close(fd)
+            _reap_children()
+    finally:
+        listener.close()
+        try:
+            # Remove the socket unless it is replaced by another daemon.
+            if os.stat(socket_path).st_ino == socket_stat.st_ino:
+                os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+def _remove_dead_socket(socket_path: str) -> None:
+    if not os.path.exists(socket_path):
+        return
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+
+
+def start_daemon(
+    command: click.Command,
+    socket_path: str,
+    get_sources: Callable[[], Iterable[str]],
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+) -> None:
+    """
+    Start the daemon in the background (detached by double fork), and return immediately.
+    Nothing is started if the socket directory is not private to the current user.
+
+    `get_sources` is called after all the subcommands are built in the daemon,
+    and returns the files whose modification makes the daemon stale.
+    """
+    try:
+        ensure_socket_dir()
+    except OSError:
+        # The command is run without the daemon.
+        return
+    _remove_dead_socket(socket_path)
+    pid = os.fork()
+    if pid > 0:
+        os.waitpid(pid, 0)
+        return
+    try:
+        os.setsid()
+        if os.fork() > 0:
+            os._exit(0)
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in range(3):
+            os.dup2(devnull, fd)
+        build_all(command)
+        serve(command, socket_path, get_sources(), idle_timeout)
+    finally:
+        os._exit(0)
@@ -2,13 +2,12 @@
 Parser of docstring
 """
 
+import functools
 import re
 from enum import Enum, auto
-from typing import List
+from typing import Any, Dict, List, Protocol, Sequence, Tuple, Type
 from dataclasses import dataclass
 
-from typing_extensions import Protocol
-
 GOOGLE_ARG_START_PATTERN = re.compile(r'^(\w+): ')
 NUMPY_ARG_START_PATTERN = re.compile(r'^(\w+):')
 RESTTXT_ARG_START_PATTERN = re.compile(r'^:param (\w+):')
@@ -16,29 +15,46 @@ RESTTXT_ARG_START_PATTERN = re.compile(r'^:param (\w+):')
 
 @dataclass(init=False)
 class DescriptionBuilder:
+    """
+    Builder of description which joins the lines of docstring.
+
+    Lines are kept as the list of (non-empty) fragments, and joined only once by `build`.
+    """
+
+    __slots__ = ('last_is_line_break', 'fragments')
+
     last_is_line_break: bool
-    description: str
+    fragments: List[str]
 
     def __init__(self) -> None:
         self.last_is_line_break = True
-        self.description = ''
-        pass
+        self.fragments = []
+
+    @property
+    def description(self) -> str:
+        return ''.join(self.fragments)
+
+    def _append(self, fragment: str) -> None:
+        if fragment:
+            self.fragments.append(fragment)
 
     def add_line(self, line: str) -> None:
         if not line:
-            if not self.description:
+            if not self.fragments:
                 return
-            self.description += '\n'
+            self.fragments.append('\n')
             self.last_is_line_break = True
             return
 
         if self.last_is_line_break:
-            self.description += line.strip()
+            self._append(line.strip())
         else:
-            if self.description.endswith('-'):
-                self.description = self.description[:-1] + line.strip()
+            if self.fragments and self.fragments[-1].endswith('-'):
+                # Join the hyphenated word
+                self._append(self.fragments.pop()[:-1])
             else:
-                self.description += ' ' + line.strip()
+                self.fragments.append(' ')
+            self._append(line.strip())
         self.last_is_line_break = False
 
     def build(self) -> str:
@@ -179,7 +195,7 @@ class Doc:
     description: str
     args: List[Arg]
 
-    def get_matched_arg_count(self, real_args: List[str]) -> int:
+    def get_matched_arg_count(self, real_args: Sequence[str]) -> int:
         """Get the number of given argument names which is also
         in docstring.
         """
@@ -191,10 +207,15 @@ class Parser(Protocol):
     def parse(self, docstring: str) -> Doc:
         pass
 
+    def parse_lines(self, docstring_lines: List[str]) -> Doc:
+        pass
+
 
 class GoogleParser:
     def parse(self, docstring: str) -> Doc:
-        docstring_lines = docstring.splitlines()
+        return self.parse_lines(docstring.splitlines())
+
+    def parse_lines(self, docstring_lines: List[str]) -> Doc:
         description_builder = DescriptionBuilder()
         found_args_indicator = False
         ends_args_section = False
@@ -221,7 +242,9 @@ class NumpyParserState(Enum):
 
 class NumpyParser:
     def parse(self, docstring: str) -> Doc:
-        docstring_lines = docstring.splitlines()
+        return self.parse_lines(docstring.splitlines())
+
+    def parse_lines(self, docstring_lines: List[str]) -> Doc:
         description_builder = DescriptionBuilder()
         state: NumpyParserState = NumpyParserState.IN_DESCRIPTION
         args_lines = []
@@ -245,7 +268,9 @@ RESTTXT_ITEM_PATTERN = re.compile(r'^:(\w+) (\w+):')
 
 class RestructuredTextParser:
     def parse(self, docstring: str) -> Doc:
-        docstring_lines = docstring.splitlines()
+        return self.parse_lines(docstring.splitlines())
+
+    def parse_lines(self, docstring_lines: List[str]) -> Doc:
         description_builder = DescriptionBuilder()
         started_args = False
         args_lines = []
@@ -264,3 +289,96 @@ class RestructuredTextParser:
                 description_builder.add_line(line)
 
         return Doc(description_builder.build(), Arg.of_lines_resttxt(args_lines))
+
+
+class DocstringStyle(Enum):
+    GOOGLE = auto()
+    NUMPY = auto()
+    RESTRUCTURED_TEXT = auto()
+
+
+def detect_styles(docstring_lines: List[str]) -> List[DocstringStyle]:
+    """
+    Scan the lines of docstring once, and return the styles whose
+    argument section is found (in the order of Google, Numpy and reStructuredText).
+
+    A style which is not returned never yields any argument when parsed.
+    """
+    found_google = False
+    found_numpy_header = False
+    found_numpy = False
+    found_resttxt_item = False
+    found_resttxt = False
+    for line in docstring_lines:
+        stripped = line.strip()
+        if stripped == 'Args:':
+            found_google = True
+        elif stripped == 'Parameters':
+            found_numpy_header = True
+        elif stripped == '----------' and found_numpy_header:
+            found_numpy = True
+        if not found_resttxt_item:
+            m = re.search(RESTTXT_ITEM_PATTERN, stripped)
+            if m:
+                # reStructuredText parser stops at the first item other than param.
+                found_resttxt_item = True
+                found_resttxt = m.group(1) == 'param'
+
+    styles = []
+    if found_google:
+        styles.append(DocstringStyle.GOOGLE)
+    if found_numpy:
+        styles.append(DocstringStyle.NUMPY)
+    if found_resttxt:
+        styles.append(DocstringStyle.RESTRUCTURED_TEXT)
+    return styles
+
+
+PARSER_TYPES: Dict[DocstringStyle, Type[Parser]] = {
+    DocstringStyle.GOOGLE: GoogleParser,
+    DocstringStyle.NUMPY: NumpyParser,
+    DocstringStyle.RESTRUCTURED_TEXT: RestructuredTextParser,
+}
+
+
+# Maximum number of parsed docstrings kept in memory.
+PARSE_CACHE_SIZE = 1024
+
+
+def parse_docstring(docstring: str, arg_names: Sequence[str]) -> Doc:
+    """
+    Detect the format of docstring and return best help generated from docstring.
+
+    Only the parsers of the detected styles are run, and the doc whose
+    arguments match `arg_names` most is returned. Google style is used
+    if no arguments are matched.
+
+    The result is memoized by the docstring and the argument names,
+    so the returned doc must not be modified.
+    """
+    return _parse_docstring_cached(docstring, tuple(arg_names))
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_docstring_cached(docstring: str, arg_names: Tuple[str, ...]) -> Doc:
+    docstring_lines = docstring.splitlines()
+    styles = detect_styles(docstring_lines)
+    docs = [PARSER_TYPES[style]().parse_lines(docstring_lines) for style in styles]
+    best_doc = max(docs, key=lambda doc: doc.get_matched_arg_count(arg_names), default=None)
+    if best_doc is not None and best_doc.get_matched_arg_count(arg_names) > 0:
+        return best_doc
+    if styles and styles[0] == DocstringStyle.GOOGLE:
+        return docs[0]
+    return GoogleParser().parse_lines(docstring_lines)
+
+
+def get_parse_cache_info() -> Any:
+    """
+    Return the hits and misses of the memoized docstring parsing
+    (`functools.lru_cache` statistics).
+    """
+    return _parse_docstring_cached.cache_info()
+
+
+def clear_parse_cache() -> None:
+    _parse_docstring_cached.cache_clear()
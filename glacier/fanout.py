@@ -0,0 +1,278 @@
+"""
+Fan-out execution of a command over many parameter sets.
+
+The command built with `fan_out` enabled accepts `--fan-out FILE` (`-` for stdin),
+which is read as JSON lines (or CSV) of parameter sets. The values given on the
+command line are used as the defaults of each parameter set.
+The non-None return value of each execution is written to stdout.
+"""
+
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import click
+
+from glacier.concurrency import bounded_map
+from glacier.misc import AsyncRunner, get_default_runner
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+
+FAN_OUT_META_KEY = 'glacier.fan_out'
+
+# Default max concurrency of async executor
+DEFAULT_ASYNC_JOBS = 64
+
+# (row number, succeeded, return value or error message)
+FanOutResult = Tuple[int, bool, Any]
+
+
+def _store_fan_out_setting(ctx: click.Context, param: click.Parameter, value: Any) -> None:
+    ctx.meta.setdefault(FAN_OUT_META_KEY, {})[param.name] = value
+
+
+def _is_fan_out(ctx: click.Context) -> bool:
+    return ctx.meta.get(FAN_OUT_META_KEY, {}).get('fan_out') is not None
+
+
+def get_fan_out_options() -> List[click.Option]:
+    """
+    Return the (eager) options to configure the fan-out.
+    """
+    common_kwargs: Dict[str, Any] = dict(
+        is_eager=True,
+        expose_value=False,
+        callback=_store_fan_out_setting,
+    )
+    return [
+        click.Option(
+            ['--fan-out'],
+            type=click.File('r'),
+            help='Execute for each parameter set read from the JSON lines (or CSV) file ("-" for stdin).',
+            **common_kwargs,
+        ),
+        click.Option(
+            ['--fan-out-format'],
+            type=click.Choice(['jsonl', 'csv']),
+            help='Format of the fan-out file (inferred from its extension by default).',
+            **common_kwargs,
+        ),
+        click.Option(
+            ['--fan-out-executor'],
+            type=click.Choice(['thread', 'process', 'async']),
+            help='Executor of the fan-out (async for async function, otherwise thread by default).',
+            **common_kwargs,
+        ),
+        click.Option(
+            ['--fan-out-jobs'],
+            type=click.IntRange(min=1),
+            help=f'Max concurrency of the fan-out (default of the executor, or {DEFAULT_ASYNC_JOBS} for async).',
+            **common_kwargs,
+        ),
+        click.Option(
+            ['--fan-out-unordered'],
+            is_flag=True,
+            help='Write the results as they complete instead of the input order.',
+            **common_kwargs,
+        ),
+    ]
+
+
+class FanOutParameterMixin:
+    """
+    Parameter which is not required on the command line when fan-out is requested,
+    since it can be given by the parameter sets.
+    """
+
+    required: bool
+
+    def process_value(self, ctx: click.Context, value: Any) -> Any:
+        if not _is_fan_out(ctx):
+            return super().process_value(ctx, value)  # type: ignore
+        required = self.required
+        self.required = False
+        try:
+            return super().process_value(ctx, value)  # type: ignore
+        finally:
+            self.required = required
+
+
+class FanOutOption(FanOutParameterMixin, click.Option):
+    pass
+
+
+class FanOutArgument(FanOutParameterMixin, click.Argument):
+    pass
+
+
+class FanOutCommandMixin:
+    """
+    Command which runs the fan-out instead of the single invocation when requested.
+
+    `async_callback` is the coroutine function version of the callback
+    (set if the original function is async), which is run by `runner`.
+    """
+
+    async_callback: Optional[Callable[..., Any]] = None
+    runner: Optional[AsyncRunner] = None
+
+    def invoke(self, ctx: click.Context) -> Any:
+        if not _is_fan_out(ctx):
+            return super().invoke(ctx)  # type: ignore
+        return run_fan_out(self, ctx, ctx.meta[FAN_OUT_META_KEY])  # type: ignore
+
+
+def read_rows(stream: IO[str], fmt: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Read the parameter sets from JSON lines or CSV.
+    """
+    if fmt is None:
+        fmt = 'csv' if getattr(stream, 'name', '').endswith('.csv') else 'jsonl'
+    if fmt == 'csv':
+        import csv
+
+        for row in csv.DictReader(stream):
+            # Empty cell means the value is not given.
+            yield {key: value for key, value in row.items() if value != ''}
+    else:
+        import json
+
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _convert_row(command: click.Command, ctx: click.Context, row_number: int, row: Dict[str, Any]) -> Dict[str, Any]:
+    params = {param.name: param for param in command.params if param.expose_value and param.name}
+    kwargs = dict(ctx.params)
+    for key, raw_value in row.items():
+        name = key.lstrip('-').replace('-', '_')
+        if name not in params:
+            raise click.UsageError(f'row {row_number}: No such parameter "{key}".', ctx)
+        try:
+            kwargs[name] = None if raw_value is None else params[name].type_cast_value(ctx, raw_value)
+        except click.BadParameter as e:
+            raise click.UsageError(f'row {row_number}: {key}: {e.message}', ctx)
+    for name, param in params.items():
+        if param.required and kwargs.get(name) is None:
+            raise click.UsageError(f'row {row_number}: Missing parameter "{name}".', ctx)
+    return kwargs
+
+
+def _describe_error(e: BaseException) -> str:
+    return f'{type(e).__name__}: {e}'
+
+
+def _call(f: Callable[..., Any], row_number: int, kwargs: Dict[str, Any]) -> FanOutResult:
+    try:
+        return row_number, True, f(**kwargs)
+    except SystemExit as e:
+        if e.code is None or e.code == 0:
+            return row_number, True, None
+        return row_number, False, f'exit {e.code}'
+    except Exception as e:
+        return row_number, False, _describe_error(e)
+
+
+def _call_in_context(
+    ctx: click.Context, f: Callable[..., Any], row_number: int, kwargs: Dict[str, Any]
+) -> FanOutResult:
+    # The current context of click is thread-local, so each row is called in its own child context,
+    # which gives the options of the invocation (e.g., `--output`) to the function in the worker,
+    # and closes what is opened for the row (e.g., `MappedFile`) after the call.
+    with click.Context(ctx.command, parent=ctx, info_name=ctx.info_name):
+        return _call(f, row_number, kwargs)
+
+
+# The context and the callback of process executor, which are inherited by the forked workers.
+_process_call: Optional[Tuple[click.Context, Callable[..., Any]]] = None
+
+
+def _call_in_process(row_number: int, kwargs: Dict[str, Any]) -> FanOutResult:
+    assert _process_call is not None
+    ctx, callback = _process_call
+    return _call_in_context(ctx, callback, row_number, kwargs)
+
+
+def _iter_executor_results(
+    executor: 'Executor',
+    fn: Callable[..., FanOutResult],
+    kwargs_list: List[Dict[str, Any]],
+    ordered: bool,
+) -> Iterator[FanOutResult]:
+    from concurrent.futures import as_completed
+
+    with executor:
+        futures: List['Future[FanOutResult]'] = [
+            executor.submit(fn, row_number, kwargs) for row_number, kwargs in enumerate(kwargs_list, 1)
+        ]
+        for future in futures if ordered else as_completed(futures):
+            yield future.result()
+
+
+async def _run_async(
+    f: Callable[..., Any],
+    kwargs_list: List[Dict[str, Any]],
+    jobs: int,
+    ordered: bool,
+    report: Callable[[FanOutResult], None],
+) -> None:
+    async for index, succeeded, value in bounded_map(f, kwargs_list, jobs, ordered=ordered):
+        report((index + 1, succeeded, value if succeeded else _describe_error(value)))
+
+
+def run_fan_out(command: FanOutCommandMixin, ctx: click.Context, settings: Dict[str, Any]) -> None:
+    """
+    Execute the callback of the command for each parameter set, and exit with 1 if any of them failed.
+    """
+    assert isinstance(command, click.Command)
+    kwargs_list = [
+        _convert_row(command, ctx, row_number, row)
+        for row_number, row in enumerate(read_rows(settings['fan_out'], settings.get('fan_out_format')), 1)
+    ]
+    executor = settings.get('fan_out_executor') or ('async' if command.async_callback else 'thread')
+    if (executor == 'async') != (command.async_callback is not None):
+        raise click.UsageError(f'{executor} executor cannot run this function.', ctx)
+    jobs = settings.get('fan_out_jobs')
+    ordered = not settings.get('fan_out_unordered')
+
+    failed = False
+
+    def report(result: FanOutResult) -> None:
+        nonlocal failed
+        row_number, succeeded, value = result
+        if not succeeded:
+            failed = True
+            click.echo(f'row {row_number}: {value}', err=True)
+        elif value is not None:
+            click.echo(value)
+
+    callback = command.callback
+    assert callback is not None
+    if executor == 'async':
+        assert command.async_callback is not None
+        runner = command.runner or get_default_runner()
+        runner.run(_run_async(command.async_callback, kwargs_list, jobs or DEFAULT_ASYNC_JOBS, ordered, report))
+    elif executor == 'process':
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise click.UsageError('process executor is not supported on this platform.', ctx)
+        global _process_call
+        _process_call = (ctx, callback)
+        try:
+            pool = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('fork'))
+            for result in _iter_executor_results(pool, _call_in_process, kwargs_list, ordered):
+                report(result)
+        finally:
+            _process_call = None
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        thread_pool = ThreadPoolExecutor(max_workers=jobs)
+        call = lambda row_number, kwargs: _call_in_context(ctx, callback, row_number, kwargs)  # noqa: E731
+        for result in _iter_executor_results(thread_pool, call, kwargs_list, ordered):
+            report(result)
+
+    if failed:
+        ctx.exit(1)
@@ -0,0 +1,43 @@
+"""
+File-typed parameters, which are opened by glacier instead of the function.
+
+- `typing.TextIO` / `typing.BinaryIO`: file opened for reading (`-` for stdin).
+- `TextOutput` / `BinaryOutput`: file opened for writing (`-` for stdout).
+- `MappedFile`: read-only memory map of the file, which is not copied into memory.
+
+Files are opened lazily, i.e., not before the first access
+(or for `MappedFile`, not before the function is called), and closed after the command.
+"""
+
+import mmap
+import sys
+from typing import BinaryIO, NewType, TextIO, Union
+
+import click
+
+TextOutput = NewType('TextOutput', TextIO)
+BinaryOutput = NewType('BinaryOutput', BinaryIO)
+
+# Supports the buffer protocol and slicing like bytes.
+MappedFile = NewType('MappedFile', mmap.mmap)
+
+
+def open_mapped_file(path: str) -> Union[mmap.mmap, bytes]:
+    """
+    Map the file read-only into memory.
+
+    stdin (`-`) and empty files cannot be mapped, so their content is returned as bytes.
+    """
+    if path == '-':
+        return sys.stdin.buffer.read()
+
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            return b''
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None:
+        ctx.call_on_close(mapped.close)
+    return mapped
@@ -0,0 +1,94 @@
+"""
+Cache of the rendered help of the commands.
+
+The help is rendered once per command and width of the terminal, and kept in the command
+for the following requests within the process (e.g., batch mode and daemon mode).
+It is also stored on disk, so that `mytool sub --help` is answered by reading the file
+without building the commands, until the script, the module registering the commands,
+the registration itself, or the source file of any function is changed.
+The color is not a part of the key, since it is stripped when the help is written (as click does).
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import click
+
+HELP_CACHE_VERSION = 1
+
+
+def get_help_width(ctx: click.Context) -> int:
+    """
+    Return the width which the help of the context is wrapped to.
+    """
+    return click.formatting.HelpFormatter(width=ctx.terminal_width, max_width=ctx.max_content_width).width
+
+
+def get_help_cache_path(cache_dir: str, script: str) -> str:
+    import hashlib
+
+    digest = hashlib.sha1(os.path.abspath(script).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, 'help', f'{digest}.json')
+
+
+def _get_key(command_path: str, width: int) -> str:
+    return f'{width}:{command_path}'
+
+
+class HelpCache:
+    """
+    On-disk cache of the help of all the commands of a CLI, which is invalidated
+    when any of `sources`, `registration` (digest of the registered commands), or the version of glacier is changed.
+    """
+
+    def __init__(self, path: str, sources: List[str], registration: str = '') -> None:
+        from glacier.cache import _get_glacier_version
+
+        self.path = path
+        self.sources = sources
+        self.version = f'{HELP_CACHE_VERSION}:{_get_glacier_version()}:{registration}'
+        self._content: Optional[Dict[str, Any]] = None
+
+    def _load(self) -> Dict[str, Any]:
+        from glacier.cache import get_source_stamps
+
+        if self._content is not None:
+            return self._content
+        stamps = {source: list(stamp) if stamp else None for source, stamp in get_source_stamps(self.sources).items()}
+        content: Dict[str, Any] = {}
+        try:
+            with open(self.path) as cache_file:
+                content = json.load(cache_file)
+        except (OSError, ValueError):
+            pass
+        if not isinstance(content, dict) or content.get('version') != self.version or content.get('stamps') != stamps:
+            content = {'version': self.version, 'stamps': stamps, 'helps': {}}
+        self._content = content
+        return content
+
+    def get(self, command_path: str, width: int) -> Optional[str]:
+        text: Optional[str] = self._load()['helps'].get(_get_key(command_path, width))
+        return text
+
+    def set(self, command_path: str, width: int, text: str) -> None:
+        from glacier.cache import write_json_atomically
+
+        content = self._load()
+        content['helps'][_get_key(command_path, width)] = text
+        write_json_atomically(self.path, content)
+
+    def lookup(
+        self,
+        prog_name: str,
+        args: Sequence[str],
+        help_option_names: Sequence[str],
+        max_width: int,
+    ) -> Optional[str]:
+        """
+        Return the cached help if the arguments are only the subcommands followed by the help option.
+        """
+        if not args or args[-1] not in help_option_names or any(arg.startswith('-') for arg in args[:-1]):
+            return None
+        width = click.formatting.HelpFormatter(max_width=max_width).width
+        return self.get(' '.join([prog_name, *args[:-1]]), width)
@@ -0,0 +1,158 @@
+"""
+Middlewares emitting the latency and the exit code of each call to the local metrics sinks.
+
+- `StatsDMiddleware`: sends the timing and the counters to StatsD over UDP.
+- `PrometheusTextfileMiddleware`: accumulates the histogram and the counters in the file
+  read by the textfile collector of node_exporter.
+
+Both are the best effort, i.e., failures of emitting the metrics never fail the command.
+"""
+
+import os
+import re
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from glacier.middleware import Call, Middleware, get_exit_code
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class StatsDMiddleware(Middleware):
+    """
+    Send `<prefix>.<command>.duration` (timing in milliseconds), `<prefix>.<command>.calls`,
+    and `<prefix>.<command>.exit_code.<code>` (counters) to StatsD.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8125, prefix: str = 'glacier') -> None:
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket: Any = None
+
+    def _send(self, call: Call, exc: Optional[BaseException]) -> None:
+        import socket
+
+        name = f'{self.prefix}.{call.command}'
+        payload = '\n'.join(
+            [
+                f'{name}.duration:{call.elapsed * 1000:.3f}|ms',
+                f'{name}.calls:1|c',
+                f'{name}.exit_code.{get_exit_code(exc)}:1|c',
+            ]
+        )
+        try:
+            if self._socket is None:
+                self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._socket.sendto(payload.encode(), self.address)
+        except OSError:
+            pass
+
+    def after(self, call: Call, result: Any) -> None:
+        self._send(call, None)
+
+    def error(self, call: Call, exc: BaseException) -> None:
+        self._send(call, exc)
+
+
+# (metric name, labels) of the sample
+SampleKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_SAMPLE_PATTERN = re.compile(r'^([A-Za-z_:][\w:]*)(?:\{(.*)\})? (\S+)$')
+_LABEL_PATTERN = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def _parse_samples(text: str) -> Dict[SampleKey, float]:
+    samples: Dict[SampleKey, float] = {}
+    for line in text.splitlines():
+        match = _SAMPLE_PATTERN.match(line)
+        if match is None:
+            continue
+        name, labels, value = match.groups()
+        try:
+            samples[(name, tuple(_LABEL_PATTERN.findall(labels or '')))] = float(value)
+        except ValueError:
+            pass
+    return samples
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_samples(samples: Dict[SampleKey, float], types: Dict[str, str]) -> str:
+    lines = []
+    for metric, metric_type in types.items():
+        lines.append(f'# TYPE {metric} {metric_type}')
+        for (name, labels), value in samples.items():
+            if name == metric or (metric_type == 'histogram' and name.rpartition('_')[0] == metric):
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f'{name}{{{label_text}}} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+class PrometheusTextfileMiddleware(Middleware):
+    """
+    Accumulate `<prefix>_command_duration_seconds` (histogram) and `<prefix>_command_exit_total`
+    (counter of each exit code) in the textfile (e.g., `/var/lib/node_exporter/mytool.prom`).
+
+    Each invocation reads and replaces the file under the lock, so the samples are accumulated
+    across the processes.
+    """
+
+    def __init__(self, path: str, prefix: str = 'glacier', buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.path = path
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+
+    def _update(self, call: Call, exc: Optional[BaseException]) -> None:
+        elapsed = call.elapsed
+        duration = f'{self.prefix}_command_duration_seconds'
+        exits = f'{self.prefix}_command_exit_total'
+        command = call.command.replace('\\', '\\\\').replace('"', '\\"')
+        increments: Dict[SampleKey, float] = {}
+        for bucket in [*map(_format_value, self.buckets), '+Inf']:
+            observed = 1.0 if elapsed <= float(bucket) else 0.0
+            increments[(f'{duration}_bucket', (('command', command), ('le', bucket)))] = observed
+        increments[(f'{duration}_sum', (('command', command),))] = elapsed
+        increments[(f'{duration}_count', (('command', command),))] = 1
+        increments[(exits, (('command', command), ('code', str(get_exit_code(exc)))))] = 1
+
+        try:
+            self._write_locked(increments, {duration: 'histogram', exits: 'counter'})
+        except OSError:
+            pass
+
+    def _write_locked(self, increments: Dict[SampleKey, float], types: Dict[str, str]) -> None:
+        import tempfile
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with open(self.path + '.lock', 'a') as lock_file:
+            try:
+                import fcntl
+
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            except ImportError:
+                # The file may lose the samples written concurrently.
+                pass
+            try:
+                with open(self.path) as textfile:
+                    samples = _parse_samples(textfile.read())
+            except FileNotFoundError:
+                samples = {}
+            for key, increment in increments.items():
+                samples[key] = samples.get(key, 0.0) + increment
+            # The collector must not read the partially written file.
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as tmp_file:
+                    tmp_file.write(_format_samples(samples, types))
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+
+    def after(self, call: Call, result: Any) -> None:
+        self._update(call, None)
+
+    def error(self, call: Call, exc: BaseException) -> None:
+        self._update(call, exc)
@@ -0,0 +1,152 @@
+"""
+Middlewares, whose hooks are called around every call of the functions of the commands.
+
+- `before(call)`: called with the converted arguments before the function.
+- `after(call, result)`: called with the return value after the function.
+- `error(call, exc)`: called with the exception raised by the function, which is re-raised after the hooks.
+
+Hooks may be coroutine functions, which are awaited by async functions, and run by the runner
+otherwise (as `glacier.misc.coro` does).
+The hooks are compiled into the function when the command is built, so the functions
+are not wrapped at all if no hook is registered.
+"""
+
+import inspect
+import time
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import click
+
+from glacier.misc import AsyncRunner, coro
+
+
+@dataclass
+class Call:
+    """
+    Call of the function of the command.
+    """
+
+    command: str
+    kwargs: Dict[str, Any]
+    # time.perf_counter() before calling the hooks of `before`.
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+class Middleware:
+    """
+    Base class of the middlewares, which overrides any of the hooks.
+    """
+
+    def before(self, call: Call) -> Any:
+        pass
+
+    def after(self, call: Call, result: Any) -> Any:
+        pass
+
+    def error(self, call: Call, exc: BaseException) -> Any:
+        pass
+
+
+def get_exit_code(exc: Optional[BaseException]) -> int:
+    """
+    Return the exit code of the command which finished by the exception (or None for success).
+    """
+    if exc is None:
+        return 0
+    if isinstance(exc, SystemExit):
+        return exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+    if isinstance(exc, (click.ClickException, click.exceptions.Exit)):
+        return exc.exit_code
+    return 1
+
+
+def _get_hooks(middlewares: Sequence[Middleware], hook_name: str) -> List[Callable[..., Any]]:
+    # Hooks which are not overridden are dropped, so they cost nothing.
+    return [
+        getattr(middleware, hook_name)
+        for middleware in middlewares
+        if getattr(type(middleware), hook_name, None) is not getattr(Middleware, hook_name)
+    ]
+
+
+def _to_sync(hooks: List[Callable[..., Any]], runner: Optional[AsyncRunner]) -> Tuple[Callable[..., Any], ...]:
+    return tuple(coro(hook, runner) if inspect.iscoroutinefunction(hook) else hook for hook in hooks)
+
+
+def _to_async(hooks: List[Callable[..., Any]]) -> Tuple[Tuple[Callable[..., Any], bool], ...]:
+    return tuple((hook, inspect.iscoroutinefunction(hook)) for hook in hooks)
+
+
+def apply_middlewares(
+    f: Callable[..., Any],
+    command: str,
+    middlewares: Sequence[Middleware],
+    runner: Optional[AsyncRunner] = None,
+) -> Callable[..., Any]:
+    """
+    Return the function which calls the hooks of the middlewares around the function,
+    or the function itself if no hook is overridden.
+    """
+    befores = _get_hooks(middlewares, 'before')
+    afters = _get_hooks(middlewares, 'after')
+    errors = _get_hooks(middlewares, 'error')
+    if not befores and not afters and not errors:
+        return f
+
+    if inspect.iscoroutinefunction(f):
+        async_befores = _to_async(befores)
+        async_afters = _to_async(afters)
+        async_errors = _to_async(errors)
+
+        @wraps(f)
+        async def async_wrapped(*args: Any, **kwargs: Any) -> Any:
+            call = Call(command, kwargs)
+            for hook, is_async in async_befores:
+                if is_async:
+                    await hook(call)
+                else:
+                    hook(call)
+            try:
+                result = await f(*args, **kwargs)
+            except BaseException as e:
+                for hook, is_async in async_errors:
+                    if is_async:
+                        await hook(call, e)
+                    else:
+                        hook(call, e)
+                raise
+            for hook, is_async in async_afters:
+                if is_async:
+                    await hook(call, result)
+                else:
+                    hook(call, result)
+            return result
+
+        return async_wrapped
+
+    sync_befores = _to_sync(befores, runner)
+    sync_afters = _to_sync(afters, runner)
+    sync_errors = _to_sync(errors, runner)
+
+    @wraps(f)
+    def wrapped(*args: Any, **kwargs: Any) -> Any:
+        call = Call(command, kwargs)
+        for hook in sync_befores:
+            hook(call)
+        try:
+            result = f(*args, **kwargs)
+        except BaseException as e:
+            for hook in sync_errors:
+                hook(call, e)
+            raise
+        for hook in sync_afters:
+            hook(call, result)
+        return result
+
+    return wrapped
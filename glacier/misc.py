@@ -1,17 +1,219 @@
-import asyncio
+import importlib
 import inspect
+import os
+import sys
 from functools import wraps
-from typing import Any
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class AsyncRunner:
+    """
+    Runner of coroutines which owns one event loop for the whole process.
+
+    The loop is created on the first run by `loop_factory` (or uvloop if
+    `use_uvloop` is set and it is installed), and reused by every command.
+    `max_workers` sets the size of the default executor used by `run_in_executor`.
+    The loop is closed at exit, after shutting down async generators and the executor.
+    """
+
+    def __init__(
+        self,
+        loop_factory: Optional[Callable[[], Any]] = None,
+        use_uvloop: bool = False,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.loop_factory = loop_factory
+        self.use_uvloop = use_uvloop
+        self.max_workers = max_workers
+        self._loop: Any = None
+        self._registers_close = False
+
+    def _new_loop(self) -> Any:
+        import asyncio
+
+        if self.loop_factory is not None:
+            return self.loop_factory()
+        if self.use_uvloop:
+            try:
+                import uvloop
+
+                return uvloop.new_event_loop()
+            except ImportError:
+                pass
+        return asyncio.new_event_loop()
+
+    @property
+    def loop(self) -> Any:
+        if self._loop is None or self._loop.is_closed():
+            import asyncio
+            import atexit
+
+            self._loop = self._new_loop()
+            if self.max_workers is not None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_workers))
+            asyncio.set_event_loop(self._loop)
+            if not self._registers_close:
+                atexit.register(self.close)
+                self._registers_close = True
+        return self._loop
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """
+        Run the coroutine until it completes, and return its result.
+        The task is cancelled (and awaited) on KeyboardInterrupt.
+        """
+        loop = self.loop
+        task = loop.create_task(coroutine)
+        try:
+            return loop.run_until_complete(task)  # type: ignore
+        except KeyboardInterrupt:
+            task.cancel()
+            loop.run_until_complete(_wait_cancelled(task))
+            raise
+
+    def close(self) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.run_until_complete(_cancel_all_tasks(loop))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+            self._loop = None
+
+
+async def _wait_cancelled(task: Any) -> None:
+    import asyncio
+
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def _cancel_all_tasks(loop: Any) -> None:
+    import asyncio
+
+    tasks = [task for task in asyncio.all_tasks(loop) if task is not asyncio.current_task(loop)]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_default_runner: Optional[AsyncRunner] = None
+
+
+def get_default_runner() -> AsyncRunner:
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = AsyncRunner()
+    return _default_runner
 
 
 # https://github.com/pallets/click/issues/85#issuecomment-503464628
-def coro(f: Any) -> Any:
+def coro(f: Any, runner: Optional[AsyncRunner] = None) -> Any:
     if not inspect.iscoroutinefunction(f):
         # not Coroutine
         return f
 
     @wraps(f)  # type: ignore
     def wrapper(*args: Any, **kwargs: Any) -> Any:
-        return asyncio.get_event_loop().run_until_complete(f(*args, **kwargs))  # type: ignore
+        return (runner or get_default_runner()).run(f(*args, **kwargs))
 
     return wrapper
+
+
+def get_prog_name() -> str:
+    """
+    Return the program name click derives from the command line.
+    """
+    try:
+        from click.utils import _detect_program_name
+
+        return _detect_program_name()
+    except ImportError:
+        return os.path.basename(sys.argv[0])
+
+
+def _split_import_path(import_path: str) -> List[str]:
+    module_name, sep, attr = import_path.partition(':')
+    if not module_name or not sep or not attr:
+        raise ValueError(f'Import path must be the form of "package.module:function", but got "{import_path}".')
+    return [module_name, *attr.split('.')]
+
+
+def import_string(import_path: str) -> Any:
+    """
+    Import the object specified by "package.module:function".
+    """
+    module_name, *attrs = _split_import_path(import_path)
+    obj = importlib.import_module(module_name)
+    for attr in attrs:
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _find_module_source(module_name: str) -> Optional[str]:
+    import importlib.util
+
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+        return None
+    return spec.origin
+
+
+def get_import_path_source(import_path: str) -> Optional[str]:
+    """
+    Get the source file of the module specified by "package.module:function" without importing it.
+    """
+    module_name = _split_import_path(import_path)[0]
+    module = sys.modules.get(module_name)
+    if module is not None:
+        path = getattr(module, '__file__', None)
+        return os.path.abspath(path) if path and os.path.isfile(path) else None
+    origin = _find_module_source(module_name)
+    return None if origin is None else os.path.abspath(origin)
+
+
+def get_import_path_docstring(import_path: str) -> Optional[str]:
+    """
+    Get the docstring of the object specified by "package.module:function"
+    by reading the source of the module instead of importing it.
+
+    Only the parent packages of the module are imported to locate it.
+    None is returned if the docstring cannot be found statically.
+    """
+    import ast
+
+    module_name, *attrs = _split_import_path(import_path)
+    if module_name in sys.modules:
+        obj: Any = sys.modules[module_name]
+        for attr in attrs:
+            obj = getattr(obj, attr, None)
+            if obj is None:
+                return None
+        return obj.__doc__  # type: ignore
+
+    origin = _find_module_source(module_name)
+    if origin is None:
+        return None
+    try:
+        with open(origin, 'rb') as source:
+            node: Any = ast.parse(source.read(), filename=origin)
+    except (OSError, SyntaxError):
+        return None
+
+    for attr in attrs:
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and child.name == attr:
+                node = child
+                break
+        else:
+            return None
+    return ast.get_docstring(node, clean=False)
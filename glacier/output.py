@@ -0,0 +1,191 @@
+"""
+Rendering of the return values of the commands (`--output`).
+"""
+
+import dataclasses
+import sys
+from enum import Enum
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import click
+
+OUTPUT_META_KEY = 'glacier.output'
+
+
+@lru_cache(maxsize=None)
+def _get_orjson() -> Any:
+    try:
+        import orjson
+
+        return orjson
+    except ImportError:
+        return None
+
+
+def _default(obj: Any) -> Any:
+    """
+    Convert the object which is not serializable by itself.
+    Dataclasses are converted shallowly since their fields are converted recursively by the serializer.
+    """
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+    if isinstance(obj, Enum):
+        # The value of Enum is what the command line accepts.
+        return obj.value
+    if isinstance(obj, Iterable) and not isinstance(obj, (str, bytes)):
+        return list(obj)
+    return str(obj)
+
+
+def dumps(value: Any, indent: bool = False) -> bytes:
+    """
+    Serialize the value to JSON, by orjson if it is installed.
+    """
+    orjson = _get_orjson()
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(value, default=_default, option=option)  # type: ignore
+        except orjson.JSONEncodeError:
+            # e.g., integer exceeding 64 bits, which is supported by the standard library.
+            pass
+    import json
+
+    # Same as the output of orjson.
+    return json.dumps(
+        value,
+        default=_default,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=(',', ': ') if indent else (',', ':'),
+    ).encode()
+
+
+def _is_rows(value: Any) -> bool:
+    return (
+        isinstance(value, Iterable)
+        and not isinstance(value, (str, bytes, dict))
+        and not dataclasses.is_dataclass(value)
+    )
+
+
+def _iter_items(value: Any) -> Iterator[Any]:
+    if _is_rows(value):
+        yield from value
+    else:
+        yield value
+
+
+def to_row(item: Any) -> Any:
+    """
+    Return the dict (for mapping or dataclass) or list of the cells of the item.
+    """
+    if isinstance(item, dict):
+        return item
+    if dataclasses.is_dataclass(item) and not isinstance(item, type):
+        return {field.name: getattr(item, field.name) for field in dataclasses.fields(item)}
+    if isinstance(item, (list, tuple)):
+        return item
+    return [item]
+
+
+def to_cell(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, Enum):
+        return str(value.value)
+    if isinstance(value, (dict, list, tuple)) or dataclasses.is_dataclass(value):
+        return dumps(value).decode()
+    return str(value)
+
+
+def _get_table(rows: Iterable[Any]) -> List[List[str]]:
+    """
+    Return the cells of the rows, with the header if the rows are dicts.
+    """
+    rows = [to_row(item) for item in rows]
+    header: Dict[str, None] = {}
+    for row in rows:
+        if isinstance(row, dict):
+            header.update(dict.fromkeys(row))
+    if not header:
+        return [[to_cell(cell) for cell in row] for row in rows]
+    table = [list(header)]
+    for row in rows:
+        if isinstance(row, dict):
+            table.append([to_cell(row.get(name)) for name in header])
+        else:
+            table.append([to_cell(cell) for cell in row])
+    return table
+
+
+def _write(data: bytes) -> None:
+    click.echo(data, nl=False)
+
+
+def render_json(value: Any) -> None:
+    _write(dumps(value, indent=True) + b'\n')
+
+
+def render_jsonl(value: Any) -> None:
+    for item in _iter_items(value):
+        _write(dumps(item) + b'\n')
+
+
+def render_csv(value: Any) -> None:
+    import csv
+
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+    writer.writerows(_get_table(_iter_items(value)))
+
+
+def render_table(value: Any) -> None:
+    table = _get_table(_iter_items(value))
+    if not table:
+        return
+    widths = [max(len(row[i]) for row in table if i < len(row)) for i in range(max(len(row) for row in table))]
+    click.echo('\n'.join('  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in table))
+
+
+OUTPUT_RENDERERS: Dict[str, Callable[[Any], None]] = {
+    'json': render_json,
+    'jsonl': render_jsonl,
+    'csv': render_csv,
+    'table': render_table,
+}
+
+
+def _store_output(ctx: click.Context, param: click.Parameter, value: Any) -> None:
+    ctx.meta[OUTPUT_META_KEY] = value
+
+
+def get_output_option(default: str) -> click.Option:
+    return click.Option(
+        ['--output'],
+        type=click.Choice(list(OUTPUT_RENDERERS.keys())),
+        default=default,
+        show_default=True,
+        is_eager=True,
+        expose_value=False,
+        callback=_store_output,
+        help='Format of the return value written to stdout.',
+    )
+
+
+def get_rendering_function(f: Callable[..., Any], default_format: str) -> Callable[..., Any]:
+    """
+    Return the function which writes the non-None return value of the function
+    in the format chosen by `--output`.
+    """
+
+    @wraps(f)
+    def wrapped(*args: Any, **kwargs: Any) -> None:
+        value = f(*args, **kwargs)
+        if value is None:
+            return
+        ctx = click.get_current_context(silent=True)
+        output_format: Optional[str] = None if ctx is None else ctx.meta.get(OUTPUT_META_KEY)
+        OUTPUT_RENDERERS[output_format or default_format](value)
+
+    return wrapped
@@ -0,0 +1,201 @@
+"""
+Timing of the phases of an invocation (`--glacier-profile` or `GLACIER_PROFILE`).
+
+The phases (importing glacier, building the commands, parsing the docstrings,
+parsing the arguments by click, converting the arguments, and running the function)
+are reported to stderr when the command finishes.
+`--glacier-profile-output` (or `GLACIER_PROFILE_OUTPUT`) also writes the cProfile statistics
+(`.pstats` or `.prof`, readable by `pstats` and snakeviz) or the Chrome trace (`.json`,
+readable by chrome://tracing and Perfetto).
+
+The profiler is started by `glacier()` before building the commands, and the functions are
+wrapped only while it is active, so nothing is measured (nor slowed down) otherwise.
+The options are removed from the arguments before click parses them, so they can be given
+anywhere on the command line.
+"""
+
+import inspect
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import IO, Any, Callable, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+PROFILE_ENV = 'GLACIER_PROFILE'
+PROFILE_OUTPUT_ENV = 'GLACIER_PROFILE_OUTPUT'
+PROFILE_DISABLED_VALUES = ('', '0', 'false')
+PROFILE_OPTION = '--glacier-profile'
+PROFILE_OUTPUT_OPTION = '--glacier-profile-output'
+
+PSTATS_EXTENSIONS = ('.pstats', '.prof')
+
+# (name, thread id, start, end) of the phase.
+Span = Tuple[str, int, float, float]
+
+_profiler: Optional['Profiler'] = None
+
+
+class Profiler:
+    """
+    Recorder of the phases, which is shared by all the commands of the process.
+    """
+
+    def __init__(self, output: Optional[str] = None, origin: Optional[float] = None) -> None:
+        self.output = output
+        self.origin = time.perf_counter() if origin is None else origin
+        self.spans: List[Span] = []
+        self._cprofile: Any = None
+        if output is not None and output.endswith(PSTATS_EXTENSIONS):
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+
+    def start(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def add(self, name: str, start: float, end: float) -> None:
+        # list.append is atomic, so the phases of the threads (e.g., fan-out) are recorded safely.
+        self.spans.append((name, threading.get_ident(), start, end))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter())
+
+    def wrap(self, f: Callable[..., Any], name: str) -> Callable[..., Any]:
+        """
+        Return the function whose calls are recorded as the phase.
+        """
+        if inspect.iscoroutinefunction(f):
+
+            @wraps(f)
+            async def async_wrapped(*args: Any, **kwargs: Any) -> Any:
+                with self.phase(name):
+                    return await f(*args, **kwargs)
+
+            return async_wrapped
+
+        @wraps(f)
+        def wrapped(*args: Any, **kwargs: Any) -> Any:
+            with self.phase(name):
+                return f(*args, **kwargs)
+
+        return wrapped
+
+    def report(self, stream: IO[str]) -> None:
+        """
+        Write the duration of each phase, indented under the phase containing it.
+        """
+        lines = ['glacier profile (ms):']
+        # Phases of each thread are nested, so the enclosing phases are kept in the stack.
+        stacks: Dict[int, List[float]] = {}
+        for name, thread_id, start, end in sorted(self.spans, key=lambda span: (span[2], -span[3])):
+            stack = stacks.setdefault(thread_id, [])
+            while stack and stack[-1] <= start:
+                stack.pop()
+            lines.append('{:>10.3f}  {}{}'.format((end - start) * 1000, '  ' * len(stack), name))
+            stack.append(end)
+        stream.write('\n'.join(lines) + '\n')
+        stream.flush()
+
+    def dump(self, path: str) -> None:
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(path)
+            return
+        import json
+
+        pid = os.getpid()
+        events = [
+            {
+                'name': name,
+                'ph': 'X',
+                'ts': (start - self.origin) * 1e6,
+                'dur': (end - start) * 1e6,
+                'pid': pid,
+                'tid': thread_id,
+            }
+            for name, thread_id, start, end in self.spans
+        ]
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+
+    def finish(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self.add('total', self.origin, time.perf_counter())
+        self.report(sys.stderr)
+        if self.output is not None:
+            self.dump(self.output)
+
+
+def get_profile_request(args: Sequence[str]) -> Tuple[bool, Optional[str]]:
+    """
+    Return whether the profile is requested by the arguments or the environment variables,
+    and the path of the output if any.
+    """
+    enabled = os.environ.get(PROFILE_ENV, '').lower() not in PROFILE_DISABLED_VALUES
+    output = os.environ.get(PROFILE_OUTPUT_ENV) or None
+    if output is not None:
+        enabled = True
+    for i, arg in enumerate(args):
+        if arg == '--':
+            break
+        if arg == PROFILE_OPTION:
+            enabled = True
+        elif arg == PROFILE_OUTPUT_OPTION and i + 1 < len(args):
+            enabled, output = True, args[i + 1]
+        elif arg.startswith(PROFILE_OUTPUT_OPTION + '='):
+            enabled, output = True, arg.partition('=')[2]
+    return enabled, output
+
+
+def strip_profile_options(args: Sequence[str]) -> List[str]:
+    """
+    Return the arguments without the options of the profile, which may be given anywhere
+    (e.g., after the subcommand) since click never parses them.
+    """
+    stripped: List[str] = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == '--':
+            stripped.extend(args[i:])
+            break
+        if arg == PROFILE_OUTPUT_OPTION:
+            i += 2
+            continue
+        if arg != PROFILE_OPTION and not arg.startswith(PROFILE_OUTPUT_OPTION + '='):
+            stripped.append(arg)
+        i += 1
+    return stripped
+
+
+def start_profiler(output: Optional[str] = None, origin: Optional[float] = None) -> Profiler:
+    global _profiler
+    _profiler = Profiler(output, origin)
+    _profiler.start()
+    return _profiler
+
+
+def stop_profiler() -> None:
+    global _profiler
+    if _profiler is not None:
+        profiler, _profiler = _profiler, None
+        profiler.finish()
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+def phase(name: str) -> ContextManager[None]:
+    """
+    Record the phase if the profiler is active.
+    """
+    return nullcontext() if _profiler is None else _profiler.phase(name)
@@ -0,0 +1,245 @@
+"""
+Static completion scripts of bash, zsh, and fish, which complete without running Python.
+
+All the subcommands, options, and choices are written into the script from the index
+of the command tree (see `glacier.completion`), so the script must be regenerated
+when the commands are changed.
+Only the choices, files, and directories are completed as the values of the parameters,
+since the completion computed by the custom click types cannot be known statically.
+"""
+
+import re
+from typing import Any, Dict, Iterator, List, Tuple
+
+STATIC_COMPLETION_SHELLS = ('bash', 'zsh', 'fish')
+
+# Resolution of the completion, shared by bash and zsh.
+# It prints the kind (choice, file, dir, or none) and the words of the choices.
+_RESOLVE_FUNCTION = """
+__PROG___glacier_resolve() {
+    local cur="$1" cmd_path="" skip=0 position=0 word spec="" value_spec="" commands
+    shift
+    for word in "$@"; do
+        if [ "$skip" -gt 0 ]; then
+            skip=$((skip - 1))
+            continue
+        fi
+        case "$word" in
+            -*)
+                spec=$(__PROG___glacier_data "option:$cmd_path $word")
+                if [ -n "$spec" ]; then
+                    value_spec="$spec"
+                    skip="${spec%% *}"
+                fi
+                ;;
+            *)
+                commands=" $(__PROG___glacier_data "commands:$cmd_path") "
+                case "$commands" in
+                    *" $word "*)
+                        cmd_path="$cmd_path/$word"
+                        position=0
+                        ;;
+                    *) position=$((position + 1)) ;;
+                esac
+                ;;
+        esac
+    done
+    if [ "$skip" -gt 0 ]; then
+        echo "${value_spec#* }"
+        return
+    fi
+    case "$cur" in
+        -*)
+            echo "choice $(__PROG___glacier_data "options:$cmd_path")"
+            return
+            ;;
+    esac
+    commands=$(__PROG___glacier_data "commands:$cmd_path")
+    if [ -n "$commands" ]; then
+        echo "choice $commands"
+        return
+    fi
+    spec=$(__PROG___glacier_data "argument:$cmd_path $position")
+    echo "${spec:-none}"
+}
+"""
+
+_BASH_TEMPLATE = """__PROG___glacier_complete() {
+    local cur="${COMP_WORDS[COMP_CWORD]}" result
+    result=$(__PROG___glacier_resolve "$cur" "${COMP_WORDS[@]:1:COMP_CWORD-1}")
+    case "${result%% *}" in
+        choice) COMPREPLY=($(compgen -W "${result#choice}" -- "$cur")) ;;
+        file)
+            compopt -o filenames 2>/dev/null
+            COMPREPLY=($(compgen -f -- "$cur"))
+            ;;
+        dir)
+            compopt -o filenames 2>/dev/null
+            COMPREPLY=($(compgen -d -- "$cur"))
+            ;;
+        *) COMPREPLY=() ;;
+    esac
+}
+
+complete -F __PROG___glacier_complete __NAME__
+"""
+
+_ZSH_TEMPLATE = """__PROG___glacier_complete() {
+    local result
+    result=$(__PROG___glacier_resolve "${words[CURRENT]}" "${(@)words[2,CURRENT-1]}")
+    case "${result%% *}" in
+        choice) compadd -- ${=${result#choice}} ;;
+        file) _files ;;
+        dir) _files -/ ;;
+    esac
+}
+
+compdef __PROG___glacier_complete __NAME__
+"""
+
+_FISH_TEMPLATE = """function __PROG___glacier_complete
+    set -l tokens (commandline -opc)
+    set -l cur (commandline -ct)
+    set -l cmd_path ''
+    set -l skip 0
+    set -l position 0
+    set -l value_spec ''
+    for word in $tokens[2..-1]
+        if test $skip -gt 0
+            set skip (math $skip - 1)
+            continue
+        end
+        if string match -q -- '-*' $word
+            set -l spec (__PROG___glacier_data "option:$cmd_path $word")
+            if test -n "$spec"
+                set value_spec $spec
+                set skip (string split -m1 ' ' -- $spec)[1]
+            end
+        else if contains -- $word (string split ' ' -- (__PROG___glacier_data "commands:$cmd_path"))
+            set cmd_path "$cmd_path/$word"
+            set position 0
+        else
+            set position (math $position + 1)
+        end
+    end
+    set -l result none
+    if test $skip -gt 0
+        set result (string split -m1 ' ' -- $value_spec)[2]
+    else if string match -q -- '-*' $cur
+        set result 'choice '(__PROG___glacier_data "options:$cmd_path")
+    else
+        set -l commands (__PROG___glacier_data "commands:$cmd_path")
+        if test -n "$commands"
+            set result "choice $commands"
+        else
+            set -l spec (__PROG___glacier_data "argument:$cmd_path $position")
+            if test -n "$spec"
+                set result $spec
+            end
+        end
+    end
+    set -l parts (string split ' ' -- $result)
+    switch $parts[1]
+        case choice
+            if test (count $parts) -gt 1
+                printf '%s\\n' $parts[2..-1]
+            end
+        case file
+            __fish_complete_path $cur
+        case dir
+            __fish_complete_directories $cur
+    end
+end
+
+complete -c __NAME__ -f -a '(__PROG___glacier_complete)'
+"""
+
+
+def _sh_quote(text: str) -> str:
+    return "'" + text.replace("'", "'\\''") + "'"
+
+
+def _fish_quote(text: str) -> str:
+    return "'" + text.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def _get_value_spec(type_node: Dict[str, Any]) -> str:
+    if type_node['name'] == 'choice':
+        return ' '.join(['choice', *type_node['choices']])
+    if type_node['name'] == 'path':
+        return 'file' if type_node['file_okay'] else 'dir'
+    return 'none'
+
+
+def _iter_entries(node: Dict[str, Any], cmd_path: str = '') -> Iterator[Tuple[str, bool, str]]:
+    """
+    Yield (key, is_pattern, value) of the data of the command and its subcommands,
+    where the pattern ends with a wildcard matching any position.
+    """
+    option_names: List[str] = []
+    for param in node['params']:
+        if param['kind'] != 'option' or param['hidden']:
+            continue
+        option_names.extend(param['opts'])
+        option_names.extend(param['secondary_opts'])
+        if not param['is_flag'] and not param['count']:
+            for opt in param['opts']:
+                yield f'option:{cmd_path} {opt}', False, f'{param["nargs"]} {_get_value_spec(param["type"])}'
+    option_names.extend(node['help_option_names'])
+    yield f'options:{cmd_path}', False, ' '.join(option_names)
+
+    position = 0
+    for param in node['params']:
+        if param['kind'] != 'argument':
+            continue
+        spec = _get_value_spec(param['type'])
+        if param['nargs'] < 0:
+            # Variadic argument takes all the rest.
+            yield f'argument:{cmd_path} ', True, spec
+            break
+        for _ in range(param['nargs']):
+            yield f'argument:{cmd_path} {position}', False, spec
+            position += 1
+
+    if 'commands' in node:
+        visible = [name for name, subnode in node['commands'].items() if not subnode['hidden']]
+        yield f'commands:{cmd_path}', False, ' '.join(visible)
+        for name, subnode in node['commands'].items():
+            yield from _iter_entries(subnode, f'{cmd_path}/{name}')
+
+
+def _get_sh_data_function(node: Dict[str, Any], prog: str) -> str:
+    lines = [f'{prog}_glacier_data() {{', '    case "$1" in']
+    for key, is_pattern, value in _iter_entries(node):
+        pattern = _sh_quote(key) + ('*' if is_pattern else '')
+        lines.append(f'        {pattern}) echo {_sh_quote(value)} ;;')
+    lines.extend(['    esac', '}'])
+    return '\n'.join(lines)
+
+
+def _get_fish_data_function(node: Dict[str, Any], prog: str) -> str:
+    lines = [f'function {prog}_glacier_data', '    switch $argv[1]']
+    for key, is_pattern, value in _iter_entries(node):
+        # Wildcards of `case` are matched even if quoted.
+        pattern = _fish_quote(key + ('*' if is_pattern else ''))
+        lines.extend([f'        case {pattern}', f'            echo {_fish_quote(value)}'])
+    lines.extend(['    end', 'end'])
+    return '\n'.join(lines)
+
+
+def get_completion_script(node: Dict[str, Any], prog_name: str, shell: str) -> str:
+    """
+    Return the static completion script of the command tree (indexed by `glacier.completion.get_command_node`).
+    """
+    prog = '_' + re.sub(r'\W', '_', prog_name)
+    header = f'# Completion of {prog_name} generated by glacier. Regenerate it when the commands are changed.\n'
+    if shell == 'fish':
+        body = _get_fish_data_function(node, prog) + '\n\n' + _FISH_TEMPLATE
+    elif shell in ('bash', 'zsh'):
+        template = _BASH_TEMPLATE if shell == 'bash' else _ZSH_TEMPLATE
+        body = _get_sh_data_function(node, prog) + '\n' + _RESOLVE_FUNCTION + '\n' + template
+        if shell == 'zsh':
+            header = f'#compdef {prog_name}\n\n' + header
+    else:
+        raise ValueError(f'Unsupported shell: {shell}')
+    return header + '\n' + body.replace('__PROG__', prog).replace('__NAME__', prog_name)
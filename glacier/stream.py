@@ -0,0 +1,223 @@
+"""
+Streaming of the items yielded by generator (and async generator) functions.
+"""
+
+import inspect
+import os
+import sys
+import threading
+from functools import wraps
+from typing import IO, Any, Callable, Dict, List, Optional, Protocol
+
+import click
+
+from glacier.output import dumps, to_cell, to_row
+
+STREAM_FORMAT_META_KEY = 'glacier.stream_format'
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+DEFAULT_FLUSH_INTERVAL = 0.1
+
+
+class StreamFormatter(Protocol):
+    def format(self, item: Any) -> str:
+        """
+        Return the text (including the line break) of the item.
+        """
+        ...
+
+
+class LineFormatter:
+    def format(self, item: Any) -> str:
+        return f'{item}\n'
+
+
+class JsonLinesFormatter:
+    def format(self, item: Any) -> str:
+        return dumps(item).decode() + '\n'
+
+
+class CsvFormatter:
+    """
+    Formatter of CSV rows, whose header is written before the first row if the items are dicts.
+    """
+
+    def __init__(self) -> None:
+        import csv
+        import io
+
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator='\n')
+        self._fieldnames: Optional[List[str]] = None
+
+    def format(self, item: Any) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        row = to_row(item)
+        if isinstance(row, dict):
+            if self._fieldnames is None:
+                self._fieldnames = list(row.keys())
+                self._writer.writerow(self._fieldnames)
+            self._writer.writerow([to_cell(row.get(name)) for name in self._fieldnames])
+        else:
+            self._writer.writerow([to_cell(cell) for cell in row])
+        return self._buffer.getvalue()
+
+
+STREAM_FORMATTERS: Dict[str, Callable[[], StreamFormatter]] = {
+    'line': LineFormatter,
+    'jsonl': JsonLinesFormatter,
+    'csv': CsvFormatter,
+}
+
+
+def register_stream_format(name: str, factory: Callable[[], StreamFormatter]) -> None:
+    """
+    Register the format which can be chosen by `--stream-format`.
+    It must be registered before the commands are built.
+    """
+    STREAM_FORMATTERS[name] = factory
+
+
+class StreamWriter:
+    """
+    Writer of the formatted items, which writes the first item immediately, and then buffers
+    the items and flushes when `buffer_size` characters are buffered or `flush_interval` seconds
+    have passed since the first buffered item (or on every item if the stream is interactive).
+    The buffered items are flushed by the timer, so they never wait for the next item.
+    """
+
+    def __init__(
+        self,
+        formatter: StreamFormatter,
+        stream: Optional[IO[str]] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.formatter = formatter
+        self.stream = sys.stdout if stream is None else stream
+        self.buffer_size = buffer_size
+        self.flush_interval = 0.0 if self.stream.isatty() else flush_interval
+        self._buffer: List[str] = []
+        self._buffered_size = 0
+        self._has_written = False
+        # The timer flushes the buffer from another thread, so the buffer and the stream are locked.
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._timer_error: Optional[BaseException] = None
+
+    def write(self, item: Any) -> None:
+        text = self.formatter.format(item)
+        with self._lock:
+            self._raise_timer_error()
+            self._buffer.append(text)
+            self._buffered_size += len(text)
+            if not self._has_written or self._buffered_size >= self.buffer_size or self.flush_interval <= 0:
+                self._flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._raise_timer_error()
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._buffer:
+            self.stream.write(''.join(self._buffer))
+            self._buffer.clear()
+            self._buffered_size = 0
+            self._has_written = True
+        self.stream.flush()
+
+    def _flush_on_timer(self) -> None:
+        with self._lock:
+            try:
+                self._flush()
+            except Exception as e:
+                # e.g., BrokenPipeError, which is raised by the next write in the thread of the command.
+                self._timer_error = e
+
+    def _raise_timer_error(self) -> None:
+        if self._timer_error is not None:
+            error, self._timer_error = self._timer_error, None
+            raise error
+
+    def __enter__(self) -> 'StreamWriter':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.flush()
+
+
+def _store_stream_format(ctx: click.Context, param: click.Parameter, value: Any) -> None:
+    ctx.meta[STREAM_FORMAT_META_KEY] = value
+
+
+def get_stream_format_option(default: str) -> click.Option:
+    return click.Option(
+        ['--stream-format'],
+        type=click.Choice(list(STREAM_FORMATTERS.keys())),
+        default=default,
+        show_default=True,
+        is_eager=True,
+        expose_value=False,
+        callback=_store_stream_format,
+        help='Format of each item written to stdout.',
+    )
+
+
+def _get_writer(default_format: str) -> StreamWriter:
+    ctx = click.get_current_context(silent=True)
+    stream_format = default_format if ctx is None else ctx.meta.get(STREAM_FORMAT_META_KEY, default_format)
+    return StreamWriter(STREAM_FORMATTERS[stream_format]())
+
+
+def _exit_on_broken_pipe() -> None:
+    # The reader of stdout is gone (e.g., `| head`), so stop writing quietly.
+    # https://docs.python.org/3/library/signal.html#note-on-sigpipe
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    except (OSError, ValueError):
+        pass
+    sys.exit(1)
+
+
+def get_streaming_function(f: Callable[..., Any], default_format: str) -> Callable[..., Any]:
+    """
+    Return the function which writes each item yielded by the (async) generator function
+    to stdout as soon as it is produced, instead of returning the generator.
+    """
+    if inspect.isasyncgenfunction(f):
+
+        @wraps(f)
+        async def async_wrapped(*args: Any, **kwargs: Any) -> None:
+            try:
+                with _get_writer(default_format) as writer:
+                    async for item in f(*args, **kwargs):
+                        writer.write(item)
+            except BrokenPipeError:
+                _exit_on_broken_pipe()
+
+        return async_wrapped
+
+    @wraps(f)
+    def wrapped(*args: Any, **kwargs: Any) -> None:
+        try:
+            with _get_writer(default_format) as writer:
+                for item in f(*args, **kwargs):
+                    writer.write(item)
+        except BrokenPipeError:
+            _exit_on_broken_pipe()
+
+    return wrapped
+
+
+def is_streaming_function(f: Callable[..., Any]) -> bool:
+    return inspect.isgeneratorfunction(f) or inspect.isasyncgenfunction(f)
@@ -0,0 +1,154 @@
+"""
+Registry of how the annotated types of the parameters are given on the command line.
+"""
+
+import types
+from collections import abc
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Literal, Optional, TextIO, Tuple, Union, get_args, get_origin
+
+import click
+
+from glacier.files import BinaryOutput, MappedFile, TextOutput, open_mapped_file
+
+
+@dataclass(frozen=True)
+class TypeHandler:
+    """
+    How the parameter of a type is exposed to click, and converted to the type.
+
+    `click_type` is passed to click as `type`, and the value given by click is converted
+    by `converter` before calling the function (if any).
+    `multiple` makes the option repeatable (or the argument variadic), and `nargs` takes
+    the fixed number of values at once, both of which are given to `converter` as a tuple.
+    """
+
+    click_type: Any
+    converter: Optional[Callable[[Any], Any]] = None
+    multiple: bool = False
+    nargs: int = 1
+    is_flag: bool = False
+
+
+# Handlers of the types (and their subclasses).
+TYPE_HANDLERS: Dict[Any, TypeHandler] = {
+    bool: TypeHandler(bool, is_flag=True),
+    str: TypeHandler(str),
+    int: TypeHandler(int),
+    float: TypeHandler(float),
+    Path: TypeHandler(click.Path(), Path),
+    datetime: TypeHandler(click.STRING, datetime.fromisoformat),
+    date: TypeHandler(click.STRING, date.fromisoformat),
+    Decimal: TypeHandler(click.STRING, Decimal),
+    # Files are opened on the first access (see `glacier.files`).
+    TextIO: TypeHandler(click.File('r', lazy=True)),
+    BinaryIO: TypeHandler(click.File('rb', lazy=True)),
+    TextOutput: TypeHandler(click.File('w', lazy=True)),
+    BinaryOutput: TypeHandler(click.File('wb', lazy=True)),
+    MappedFile: TypeHandler(click.Path(exists=True, dir_okay=False, allow_dash=True), open_mapped_file),
+}
+
+
+def register_type(annotation: Any, handler: TypeHandler) -> None:
+    """
+    Register the handler of the type, which overrides the handler of the same type.
+    It must be registered before the commands are built.
+    """
+    TYPE_HANDLERS[annotation] = handler
+    _resolve_cached.cache_clear()
+
+
+def unregister_type(annotation: Any) -> None:
+    TYPE_HANDLERS.pop(annotation, None)
+    _resolve_cached.cache_clear()
+
+
+def _get_enum_handler(annotation: Any) -> TypeHandler:
+    value_to_entry = {entry.value: entry for entry in annotation}
+    return TypeHandler(click.Choice(list(value_to_entry.keys())), value_to_entry.__getitem__)
+
+
+def _get_literal_handler(values: Tuple[Any, ...]) -> TypeHandler:
+    if all(isinstance(value, str) for value in values):
+        return TypeHandler(click.Choice(list(values)))
+    text_to_value = {str(value): value for value in values}
+    return TypeHandler(click.Choice(list(text_to_value.keys())), text_to_value.__getitem__)
+
+
+def _get_multiple_handler(item: TypeHandler, container: type) -> Optional[TypeHandler]:
+    if item.multiple or item.nargs != 1 or item.is_flag:
+        return None
+    item_converter = item.converter
+    if item_converter is None:
+        converter: Optional[Callable[[Any], Any]] = None if container is tuple else container
+    else:
+        converter = lambda values: container(item_converter(value) for value in values)  # noqa: E731
+    return TypeHandler(item.click_type, converter, multiple=True)
+
+
+def _get_tuple_handler(items: List[TypeHandler]) -> Optional[TypeHandler]:
+    if any(item.multiple or item.nargs != 1 or item.is_flag for item in items):
+        return None
+    item_converters = [item.converter for item in items]
+    converter: Optional[Callable[[Any], Any]] = None
+    if any(item_converters):
+        converter = lambda values: tuple(  # noqa: E731
+            value if item_converter is None else item_converter(value)
+            for value, item_converter in zip(values, item_converters)
+        )
+    return TypeHandler(tuple(item.click_type for item in items), converter, nargs=len(items))
+
+
+def _resolve(annotation: Any) -> Optional[TypeHandler]:
+    origin = get_origin(annotation)
+    if origin is None:
+        if annotation in TYPE_HANDLERS:
+            return TYPE_HANDLERS[annotation]
+        if isinstance(annotation, type):
+            if issubclass(annotation, Enum):
+                return _get_enum_handler(annotation)
+            for base in annotation.__mro__:
+                if base in TYPE_HANDLERS:
+                    return TYPE_HANDLERS[base]
+        return None
+
+    args = get_args(annotation)
+    if origin is Union or origin is getattr(types, 'UnionType', None):
+        # Optional[T]
+        non_none_args = [arg for arg in args if arg is not type(None)]
+        return resolve_type_handler(non_none_args[0]) if len(non_none_args) == 1 else None
+    if origin is Literal:
+        return _get_literal_handler(args)
+    if origin in (list, tuple, abc.Sequence):
+        if origin is tuple and not (len(args) == 2 and args[1] is Ellipsis):
+            # Fixed-length tuple, e.g., Tuple[int, str]
+            items = [resolve_type_handler(arg) for arg in args]
+            return None if not items or None in items else _get_tuple_handler(items)  # type: ignore
+        item = resolve_type_handler(args[0]) if args else TYPE_HANDLERS[str]
+        if item is None:
+            return None
+        return _get_multiple_handler(item, tuple if origin is tuple else list)
+    return None
+
+
+@lru_cache(maxsize=None)
+def _resolve_cached(annotation: Any) -> Optional[TypeHandler]:
+    return _resolve(annotation)
+
+
+def resolve_type_handler(annotation: Any) -> Optional[TypeHandler]:
+    """
+    Return the handler of the annotation, or None if it is not supported.
+    The resolution is cached for each annotation.
+    """
+    try:
+        hash(annotation)
+    except TypeError:
+        # Unhashable annotation is not supported.
+        return None
+    return _resolve_cached(annotation)
@@ -0,0 +1,13 @@
+"""
+Module which is only imported through the import path of glacier.
+"""
+
+
+def hello(name: str) -> None:
+    """
+    Say hello.
+
+    Args:
+        name: Name of the user.
+    """
+    print(f'hello {name}')
@@ -0,0 +1,23 @@
+"""
+Module whose annotations are postponed (stored as strings).
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import List, Optional
+
+
+class Color(Enum):
+    RED = 'red'
+    BLUE = 'blue'
+
+
+def paint(_targets: List[str], color: Color, times: int = 1, note: Optional[str] = None) -> None:
+    """
+    Paint the targets.
+
+    Args:
+        color: Color of the paint.
+    """
+    print(f'{",".join(_targets)} {color.name} {times} {note}')
@@ -0,0 +1,131 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from enum import Enum
+from typing import Any, Callable, Optional
+
+from click.testing import CliRunner
+
+from glacier.cache import SpecCache
+from glacier.core import BuildOptions, FunctionSpec, _get_click_command
+from tests.test_core import my_function_google
+
+SOURCE = '''
+def main(name: str, verbose: bool = False) -> None:
+    """
+    Description of main.
+
+    Args:
+        name: Name of the user.
+        verbose: Verbose output.
+    """
+    print(name)
+'''
+
+
+class Env(Enum):
+    DEV = 'dev'
+    PROD = 'prod'
+
+
+def deploy(env: Optional[Env] = Env.DEV) -> None:
+    print(env)
+
+
+def make_command(default: int) -> Callable[..., None]:
+    def command(count: int = default) -> None:
+        print(count)
+
+    return command
+
+
+def load_module(path: str) -> Any:
+    spec = importlib.util.spec_from_file_location('cached_module', path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestSpecCache(unittest.TestCase):
+    def test_spec_cache_reused(self) -> None:
+        """
+        Check if the cached specification is used to build the command.
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            _get_click_command(my_function_google, options=BuildOptions(SpecCache(cache_dir)))
+            assert len(os.listdir(cache_dir)) == 1
+
+            # Cache is loaded by the new instance (i.e., another process).
+            spec_cache = SpecCache(cache_dir)
+            cached = spec_cache.get(my_function_google)
+            assert cached is not None
+            assert cached['description'] == 'This is my test function for generating CLI entrypoint.'
+            cached['params'][1]['help'] = 'Help from cache.'
+
+            f = _get_click_command(my_function_google, options=BuildOptions(spec_cache))
+            result = CliRunner().invoke(f, ['-h'])
+            assert not result.exception
+            assert 'Help from cache.' in result.output
+        return
+
+    def test_spec_cache_invalidated(self) -> None:
+        """
+        Check if the cache is invalidated when the source file is modified.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_path = os.path.join(tmp_dir, 'cached_module.py')
+            with open(source_path, 'w') as source:
+                source.write(SOURCE)
+            cache_dir = os.path.join(tmp_dir, 'cache')
+
+            module = load_module(source_path)
+            _get_click_command(module.main, options=BuildOptions(SpecCache(cache_dir)))
+            assert SpecCache(cache_dir).get(module.main) is not None
+
+            stat = os.stat(source_path)
+            os.utime(source_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            assert SpecCache(cache_dir).get(module.main) is None
+        return
+
+    def test_defaults_not_cached(self) -> None:
+        """
+        Check if the defaults are read from the function, since they may be taken from another module.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_path = os.path.join(tmp_dir, 'cached_module.py')
+            with open(source_path, 'w') as source:
+                source.write(SOURCE)
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            module = load_module(source_path)
+            _get_click_command(module.main, options=BuildOptions(SpecCache(cache_dir)))
+
+            # e.g., the constant imported from the other module is changed.
+            module.main.__defaults__ = (True,)
+            spec_cache = SpecCache(cache_dir)
+            cached = spec_cache.get(module.main)
+            assert cached is not None
+            f = _get_click_command(module.main, options=BuildOptions(spec_cache))
+            assert [(param.name, param.required) for param in f.params] == [('name', True), ('verbose', False)]
+            assert f.params[1].default is True
+
+            _get_click_command(deploy, options=BuildOptions(spec_cache))
+            cached = SpecCache(cache_dir).get(deploy)
+            assert cached is not None
+            spec = FunctionSpec.from_dict(cached, deploy.__annotations__, {'env': Env.PROD})
+            assert spec.params[0].default is Env.PROD
+        return
+
+    def test_local_function_not_cached(self) -> None:
+        """
+        Check if the functions made by the factory, which share the name, are never cached.
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for default in [1, 2]:
+                f = _get_click_command(make_command(default), options=BuildOptions(SpecCache(cache_dir)))
+                result = CliRunner().invoke(f, [])
+                assert not result.exception
+                assert result.output == f'{default}\n'
+            assert SpecCache(cache_dir).get(make_command(1)) is None
+        return
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import click
+from click.shell_completion import shell_complete
+from click.testing import CliRunner
+
+from glacier.completion import complete_from_index, load_completion_index, write_completion_index
+from glacier.core import glacier_group
+
+
+class Color(Enum):
+    RED = 'red'
+    BLUE = 'blue'
+
+
+def paint(color: Color, verbose: bool = False) -> None:
+    """
+    Paint with the color.
+    """
+    print(color)
+
+
+def greet(name: str) -> None:
+    """
+    Greet the user.
+    """
+    print(name)
+
+
+def complete(command: Any, args: str, instruction: str = 'bash_complete', root: Optional[Dict[str, Any]] = None) -> str:
+    env = {'COMP_WORDS': f'mytool {args}', 'COMP_CWORD': str(len(args.split(' ')))}
+    with CliRunner().isolation(env=env) as streams:
+        if root is None:
+            shell_complete(command, {}, 'mytool', '_MYTOOL_COMPLETE', instruction)
+        else:
+            assert complete_from_index(root, 'mytool', '_MYTOOL_COMPLETE', instruction) == 0
+        return streams[0].getvalue().decode()
+
+
+class TestCompletion(unittest.TestCase):
+    def test_completion_from_index(self) -> None:
+        """
+        Check if the completion from the index is the same as from the commands.
+        """
+        group = glacier_group([paint, greet])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index_path = os.path.join(tmp_dir, 'completion', 'index.json')
+            sources: List[str] = [__file__]
+            write_completion_index(index_path, group, sources)
+            root = load_completion_index(index_path, sources)
+            assert root is not None
+
+        for args in ['', 'p', 'paint -', 'paint --color ', 'paint --color r', 'greet --']:
+            for instruction in ['bash_complete', 'zsh_complete', 'fish_complete']:
+                expected = complete(group, args, instruction)
+                assert expected
+                assert complete(None, args, instruction, root) == expected, (args, instruction)
+        return
+
+    def test_completion_index_invalidated(self) -> None:
+        """
+        Check if the index is not used after the source file or the registration is modified.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_path = os.path.join(tmp_dir, 'source.py')
+            with open(source_path, 'w') as source:
+                source.write('')
+            index_path = os.path.join(tmp_dir, 'index.json')
+            write_completion_index(index_path, glacier_group([greet]), [source_path], 'registration')
+            assert load_completion_index(index_path, [source_path], 'registration') is not None
+            assert load_completion_index(index_path, [source_path], 'renamed') is None
+
+            with open(source_path, 'w') as source:
+                source.write('# modified')
+            assert load_completion_index(index_path, [source_path], 'registration') is None
+        return
+
+    def test_dynamic_completion(self) -> None:
+        """
+        Check if the completion by a custom type is left to the commands.
+        """
+
+        class UserType(click.ParamType):
+            name = 'user'
+
+            def shell_complete(self, ctx: click.Context, param: click.Parameter, incomplete: str) -> List[Any]:
+                return [click.shell_completion.CompletionItem('alice')]
+
+        command = click.Command('mytool', params=[click.Option(['--user'], type=UserType())])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index_path = os.path.join(tmp_dir, 'index.json')
+            write_completion_index(index_path, command, [])
+            root = load_completion_index(index_path, [])
+        assert root is not None
+
+        with mock.patch.dict(os.environ, {'COMP_WORDS': 'mytool --user ', 'COMP_CWORD': '2'}):
+            assert complete_from_index(root, 'mytool', '_MYTOOL_COMPLETE', 'bash_complete') is None
+        assert complete(command, '--') == complete(None, '--', root=root)
+        return
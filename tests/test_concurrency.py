@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+from typing import Any, Dict, List
+
+from glacier.concurrency import bounded_map, concurrently
+from glacier.core import _get_click_command
+from glacier.misc import AsyncRunner
+from tests.utils import get_runner_separating_stderr
+
+
+class TestConcurrency(unittest.TestCase):
+    def test_concurrently(self) -> None:
+        """
+        Check if the async function is called concurrently for each value with the bounded concurrency.
+        """
+        running = 0
+        max_running = 0
+
+        @concurrently('url', max_concurrency=2, timeout=0.5)
+        async def fetch(url: str, retry: int = 1) -> str:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            try:
+                if url == 'slow':
+                    await asyncio.sleep(10)
+                await asyncio.sleep(0.01)
+                if url == 'broken':
+                    raise ValueError('broken url')
+                return f'{url} {retry}'
+            finally:
+                running -= 1
+
+        command = _get_click_command(fetch)
+        runner = get_runner_separating_stderr()
+        result = runner.invoke(command, ['--url', 'a', '--url', 'b', '--url', 'c', '--retry', '3'])
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == 'a 3\nb 3\nc 3\n'
+        assert max_running == 2
+
+        result = runner.invoke(command, ['--url', 'a', '--url', 'slow', '--url', 'broken'])
+        assert result.exit_code == 1
+        assert result.stdout == 'a 1\n'
+        assert 'slow: TimeoutError: timed out after 0.5 seconds\n' in result.stderr
+        assert 'broken: ValueError: broken url\n' in result.stderr
+        assert '2 of 3 calls failed.' in result.stderr
+        assert running == 0
+        return
+
+    def test_positional(self) -> None:
+        """
+        Check if positional argument accepts multiple values.
+        """
+
+        @concurrently('_n')
+        async def double(_n: int) -> int:
+            return _n * 2
+
+        command = _get_click_command(double)
+        result = get_runner_separating_stderr().invoke(command, ['1', '2', '3'])
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == '2\n4\n6\n'
+        return
+
+    def test_not_async(self) -> None:
+        """
+        Check if sync function is rejected.
+        """
+        with self.assertRaises(TypeError):
+            concurrently('x')(lambda x: x)
+        return
+
+    def test_cancel(self) -> None:
+        """
+        Check if the in-flight calls are cancelled when the iteration is interrupted.
+        """
+        cancelled: List[int] = []
+
+        async def sleep(index: int) -> None:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(index)
+                raise
+
+        async def interrupt() -> None:
+            kwargs_list: List[Dict[str, Any]] = [{'index': index} for index in range(5)]
+            async for _ in bounded_map(sleep, kwargs_list, max_concurrency=3):
+                pass
+
+        runner = AsyncRunner()
+        loop = runner.loop
+        loop.call_later(0.05, loop.stop)
+        task = loop.create_task(interrupt())
+        loop.run_forever()
+        task.cancel()
+        loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+        assert sorted(cancelled) == [0, 1, 2]
+        runner.close()
+        return
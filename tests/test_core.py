@@ -1,10 +1,38 @@
+import sys
+import tempfile
 import unittest
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
 from enum import Enum
+from pathlib import Path
 
+import click
 from click.testing import CliRunner
 
-from glacier.core import _get_click_command, glacier_group
-from tests.utils import get_options, get_values
+from glacier.cache import SpecCache
+from glacier.core import (
+    BuildOptions,
+    CommandSpec,
+    FunctionSpec,
+    LazyGroup,
+    _get_click_command,
+    _strips_name_suffix,
+    get_annotations,
+    get_converters,
+    glacier_group,
+    glacier_wrap,
+)
+from tests.postponed_commands import Color, paint
+from tests.utils import get_options, get_runner_separating_stderr, get_values
+
+
+@dataclass
+class Greeter:
+    greeting: str
+
+    def __call__(self, name: str, times: int = 1) -> None:
+        print(self.greeting, name * times)
 
 
 class Env(Enum):
@@ -261,3 +289,237 @@ class TestCore(unittest.TestCase):
             == 'b\n'
         )
         return
+
+    def test_glacier_group_names(self) -> None:
+        """
+        Check if the subcommands are named as click names them, and the nested groups are not the root.
+        """
+
+        def deploy_command() -> None:
+            print('deploy')
+
+        def status() -> None:
+            print('status')
+
+        f = glacier_group({'cluster': [deploy_command, status]})
+        runner = CliRunner()
+        # click < 8.2 keeps the suffix.
+        deploy_name = 'deploy' if _strips_name_suffix() else 'deploy-command'
+        assert runner.invoke(f, ['cluster', deploy_name]).output == 'deploy\n'
+
+        # completion-script is hidden, but can be invoked.
+        root_help = runner.invoke(f, ['-h']).output
+        assert 'completion-script' not in root_help
+        assert 'Usage:' in runner.invoke(f, ['completion-script', '-h']).output
+        nested_help = runner.invoke(f, ['cluster', '-h']).output
+        assert 'status' in nested_help
+        assert 'completion-script' not in nested_help
+        assert 'show-completion' not in nested_help
+        return
+
+    def test_glacier_group_lazy(self) -> None:
+        """
+        Check if subcommands are built only when they are looked up.
+        """
+
+        def a_1() -> None:
+            """Description of a_1."""
+            print('a_1')
+
+        def b() -> None:
+            """Description of b."""
+            print('b')
+
+        f = glacier_group(
+            {
+                'a': [
+                    a_1,
+                ],
+                'b': b,
+            }
+        )
+        assert not f.commands
+        runner = CliRunner()
+
+        # Help of the group only uses the short help.
+        result = runner.invoke(f, ['-h'])
+        assert not result.exception
+        assert 'Description of b.' in result.output
+        assert not f.commands
+
+        assert runner.invoke(f, ['b']).output == 'b\n'
+        assert list(f.commands) == ['b']
+        return
+
+    def test_glacier_group_lazy_failure(self) -> None:
+        """
+        Check if a subcommand whose build failed is still listed and can be built again.
+        """
+
+        def b() -> None:
+            print('b')
+
+        f = glacier_group({'b': b})
+        assert isinstance(f, LazyGroup)
+        attempts = 0
+        factory = f.lazy_commands['b'].factory
+
+        def flaky_factory() -> click.Command:
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise ImportError('not yet')
+            return factory()
+
+        f.add_lazy_command('b', flaky_factory)
+        ctx = click.Context(f)
+        with self.assertRaises(ImportError):
+            f.get_command(ctx, 'b')
+        assert 'b' in f.list_commands(ctx)
+        assert CliRunner().invoke(f, ['b']).output == 'b\n'
+        assert 'b' not in f.lazy_commands
+        return
+
+    @unittest.skipUnless(hasattr(click.exceptions, 'NoSuchCommand'), 'click < 8.4 does not suggest commands.')
+    def test_glacier_group_lazy_suggestion(self) -> None:
+        """
+        Check if the unbuilt subcommands are suggested for a mistyped name.
+        """
+
+        def greet() -> None:
+            print('greet')
+
+        f = glacier_group({'greet': greet})
+        result = CliRunner().invoke(f, ['gret'])
+        assert result.exit_code == 2
+        assert "Did you mean 'greet'?" in result.output
+        return
+
+    def test_glacier_group_import_path(self) -> None:
+        """
+        Check if the module of the import path is imported only on dispatch.
+        """
+        f = glacier_group(
+            {
+                'hello': 'tests.import_path_commands:hello',
+            }
+        )
+        runner = CliRunner()
+        result = runner.invoke(f, ['-h'])
+        assert not result.exception
+        assert 'Say hello.' in result.output
+        assert 'tests.import_path_commands' not in sys.modules
+
+        assert runner.invoke(f, ['hello', '--name=taro']).output == 'hello taro\n'
+        assert 'tests.import_path_commands' in sys.modules
+        return
+
+    def test_glacier_group_batch(self) -> None:
+        """
+        Check if command lines from stdin are executed in batch mode.
+        """
+
+        def a_1(name: str) -> None:
+            print(f'a_1 {name}')
+
+        def b() -> None:
+            print('b')
+
+        f = glacier_group(
+            {
+                'a': [
+                    a_1,
+                ],
+                'b': b,
+            },
+            batch=True,
+        )
+        result = get_runner_separating_stderr().invoke(
+            f,
+            ['--batch'],
+            input='a a-1 --name "taro jiro"\n\n# comment\nb\nc\n',
+        )
+        assert result.exit_code == 1
+        assert result.stdout == 'a_1 taro jiro\nb\n'
+        assert 'line 1: exit 0' in result.stderr
+        assert 'line 4: exit 0' in result.stderr
+        assert 'line 5: exit 2' in result.stderr
+        return
+
+    def test_glacier_wrap_converters(self) -> None:
+        """
+        Check if the values are converted to the annotated types, and nothing is wrapped without conversion.
+        """
+
+        def f(_path: Path, at: datetime, amount: Decimal, env: Env = Env.DEV, name: str = '') -> None:
+            assert isinstance(_path, Path)
+            assert at == datetime(2020, 1, 2, 3, 4)
+            assert amount == Decimal('0.1')
+            assert isinstance(env, Env)
+            print(env.name)
+
+        runner = get_runner_separating_stderr()
+        command = _get_click_command(f)
+        result = runner.invoke(command, ['a.txt', '--at', '2020-01-02T03:04', '--amount', '0.1'])
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == 'DEV\n'
+        result = runner.invoke(command, ['a.txt', '--at', '2020-01-02T03:04', '--amount', '0.1', '--env', 'production'])
+        assert result.stdout == 'PROD\n'
+        result = runner.invoke(command, ['a.txt', '--at', 'yesterday', '--amount', '0.1'])
+        assert result.exit_code == 2
+        assert "Invalid value for 'at'" in result.stderr
+
+        def g(name: str, count: int = 1) -> None:
+            pass
+
+        assert glacier_wrap(g, get_converters(FunctionSpec.of_function(g).params)) is g
+        return
+
+    def test_postponed_annotations(self) -> None:
+        """
+        Check if the string annotations are resolved, also from the spec cache.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            options = BuildOptions(spec_cache=SpecCache(directory))
+            for _ in range(2):
+                command = _get_click_command(paint, options=options)
+                result = get_runner_separating_stderr().invoke(command, ['a', 'b', '--color', 'red', '--times', '2'])
+                assert result.exit_code == 0, result.stderr
+                assert result.stdout == 'a,b RED 2 None\n'
+        assert get_annotations(paint)['color'] is Color
+        return
+
+    def test_callable_instance(self) -> None:
+        """
+        Check if the unhashable callable instance (e.g., dataclass with `__call__`) is accepted.
+        """
+        greeter = Greeter('hi')
+        runner = CliRunner()
+        result = runner.invoke(glacier_group({'greet': greeter}), ['greet', '--name', 'a', '--times', '2'])
+        assert result.output == 'hi aa\n'
+        result = runner.invoke(glacier_group([greeter]), ['greeter', '--name', 'a'])
+        assert result.output == 'hi a\n'
+        return
+
+    def test_command_spec(self) -> None:
+        """
+        Check if the callback wraps the function only once, and renamed command keeps the function intact.
+        """
+
+        async def f(env: Env, count: int = 1) -> None:
+            print(env.name * count)
+
+        command_spec = CommandSpec.of_function(f, 'renamed_f')
+        assert command_spec.name == 'renamed-f'
+        assert command_spec.callback.__wrapped__ is f  # type: ignore
+        assert command_spec.async_callback is not None
+        assert command_spec.async_callback.__wrapped__ is f  # type: ignore
+        assert f.__name__ == 'f'
+
+        f_group = glacier_group({'renamed_f': f, 'sub_commands': [f]})
+        result = get_runner_separating_stderr().invoke(f_group, ['renamed-f', '--env', 'production', '--count', '2'])
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == 'PRODPROD\n'
+        result = get_runner_separating_stderr().invoke(f_group, ['sub-commands', 'f', '--env', 'development'])
+        assert result.stdout == 'DEV\n'
+        return
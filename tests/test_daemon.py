@@ -0,0 +1,100 @@
+import os
+import socket
+import tempfile
+import time
+import unittest
+from typing import List, Optional
+
+from glacier.client import forward, get_socket_path, is_daemon_supported
+from glacier.core import glacier_group
+from glacier.daemon import start_daemon
+
+
+def hello(name: str) -> None:
+    print(f'hello {name} {os.environ.get("GLACIER_TEST_ENV")}')
+
+
+def forward_captured(socket_path: str, argv: List[str]) -> 'tuple[Optional[int], str]':
+    """
+    Forward the invocation with the pipe as stdout, and return the exit code and the output.
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        exit_code = forward(socket_path, argv, fds=(0, write_fd, 2))
+    finally:
+        os.close(write_fd)
+    with os.fdopen(read_fd) as output:
+        return exit_code, output.read()
+
+
+@unittest.skipUnless(is_daemon_supported(), 'daemon is not supported on this platform')
+class TestDaemon(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.original_runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+        os.environ['XDG_RUNTIME_DIR'] = self.tmp_dir.name
+
+    def tearDown(self) -> None:
+        if self.original_runtime_dir is None:
+            del os.environ['XDG_RUNTIME_DIR']
+        else:
+            os.environ['XDG_RUNTIME_DIR'] = self.original_runtime_dir
+        self.tmp_dir.cleanup()
+
+    def test_forward_to_daemon(self) -> None:
+        """
+        Check if the invocation is forwarded to the daemon, and it becomes stale when the source is modified.
+        """
+        source_path = os.path.join(self.tmp_dir.name, 'cli.py')
+        with open(source_path, 'w') as source:
+            source.write('# cli')
+        socket_path = get_socket_path(source_path)
+
+        # No daemon is running yet.
+        assert forward(socket_path, [source_path, 'hello', '--name=taro']) is None
+
+        start_daemon(glacier_group([hello]), socket_path, lambda: [source_path], idle_timeout=10)
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.05)
+
+        os.environ['GLACIER_TEST_ENV'] = 'forwarded'
+        try:
+            assert forward_captured(socket_path, [source_path, 'hello', '--name=taro']) == (
+                0,
+                'hello taro forwarded\n',
+            )
+        finally:
+            del os.environ['GLACIER_TEST_ENV']
+        assert forward_captured(socket_path, [source_path, 'unknown'])[0] == 2
+
+        # The daemon exits when the source is modified.
+        stat = os.stat(source_path)
+        os.utime(source_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert forward(socket_path, [source_path, 'hello', '--name=taro']) is None
+        for _ in range(100):
+            if not os.path.exists(socket_path):
+                break
+            time.sleep(0.05)
+        assert not os.path.exists(socket_path)
+        return
+
+    def test_insecure_socket_dir(self) -> None:
+        """
+        Check if the socket in the directory accessible by other users is never used nor created.
+        """
+        source_path = os.path.join(self.tmp_dir.name, 'cli.py')
+        socket_path = get_socket_path(source_path)
+        os.makedirs(os.path.dirname(socket_path), mode=0o755)
+        os.chmod(os.path.dirname(socket_path), 0o755)
+
+        start_daemon(glacier_group([hello]), socket_path, lambda: [source_path], idle_timeout=10)
+        assert not os.path.exists(socket_path)
+
+        # The socket bound by anyone else in the directory is not trusted.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(socket_path)
+            server.listen()
+            assert forward(socket_path, [source_path, 'hello', '--name=taro']) is None
+        return
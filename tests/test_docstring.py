@@ -1,8 +1,59 @@
+import time
 import unittest
+from typing import List, Type
 
-from glacier.docstring import Arg, Doc, GoogleParser, NumpyParser
+from glacier.docstring import (
+    Arg,
+    DescriptionBuilder,
+    Doc,
+    GoogleParser,
+    NumpyParser,
+    Parser,
+    clear_parse_cache,
+    get_parse_cache_info,
+    parse_docstring,
+)
 
 from glacier.docstring import RestructuredTextParser
+from tests.test_core import (
+    my_function_google,
+    my_function_numpy_docstring,
+    my_function_restructured_text_docstring,
+)
+
+
+def build_description(lines: List[str]) -> str:
+    builder = DescriptionBuilder()
+    for line in lines:
+        builder.add_line(line)
+    return builder.build()
+
+
+class TestDescriptionBuilder(unittest.TestCase):
+    def test_description_builder(self) -> None:
+        assert build_description(['', '  first line', '  second line', '']) == 'first line second line'
+        assert build_description(['first', '', 'second', '', '']) == 'first\nsecond'
+        assert build_description(['descrip-', 'tion of hyphen-', '-', 'ated']) == 'description of hyphenated'
+        assert build_description(['   ', 'after whitespace', '-', '   ', 'x']) == 'after whitespace  x'
+        return
+
+    def test_description_builder_linear(self) -> None:
+        """
+        Micro-benchmark to check that the time to build description grows linearly.
+        """
+
+        def measure(n: int) -> float:
+            lines = ['description of the command which is hyphen-'] * n
+            elapsed = []
+            for _ in range(3):
+                start = time.perf_counter()
+                build_description(lines)
+                elapsed.append(time.perf_counter() - start)
+            return min(elapsed)
+
+        # 10 times more lines must not take 100 times longer (quadratic).
+        assert measure(20000) < measure(2000) * 40
+        return
 
 
 class TestArg(unittest.TestCase):
@@ -139,3 +190,97 @@ class TestDocstringRestructuredText(unittest.TestCase):
             ],
         )
         return
+
+
+def parse_docstring_best_of_three(docstring: str, arg_names: List[str]) -> Doc:
+    """
+    Reference implementation which runs all the parsers.
+    """
+    parser_types: List[Type[Parser]] = [
+        GoogleParser,
+        NumpyParser,
+        RestructuredTextParser,
+    ]
+    docs = [parser_type().parse(docstring=docstring) for parser_type in parser_types]
+    return max(docs, key=lambda doc: doc.get_matched_arg_count(arg_names))
+
+
+PARITY_DOCSTRINGS = [
+    '',
+    """ This is oneline docstring. """,
+    my_function_google.__doc__,
+    my_function_numpy_docstring.__doc__,
+    my_function_restructured_text_docstring.__doc__,
+    """
+    Numpy header without the line.
+
+    Parameters
+    foo: str
+        Description of foo.
+    """,
+    """
+    reStructuredText with returns first.
+
+    :returns int: Description of return.
+    :param foo: Description of foo.
+    """,
+    """
+    Mixed styles.
+
+    Args:
+        foo: Description of foo.
+
+    :param foo: Description of foo.
+    :param bar: Description of bar.
+    """,
+    """
+    Numpy and Google with the same number of arguments.
+
+    Parameters
+    ----------
+    foo: str
+        Description of foo.
+
+    Args:
+        foo: Description of foo.
+    """,
+    """
+    Arguments which are not in the signature.
+
+    Args:
+        baz: Description of baz.
+    """,
+]
+
+
+class TestParseDocstring(unittest.TestCase):
+    def test_parse_docstring_parity(self) -> None:
+        """
+        Check if single-pass detection returns the same doc as running all the parsers.
+        """
+        arg_names_list = [
+            [],
+            ['foo'],
+            ['foo', 'bar'],
+            ['_path', 'name', 'age', 'is_test', 'env', 'verbose'],
+        ]
+        for docstring in PARITY_DOCSTRINGS:
+            assert docstring is not None
+            for arg_names in arg_names_list:
+                assert parse_docstring(docstring, arg_names) == parse_docstring_best_of_three(docstring, arg_names)
+        return
+
+    def test_parse_docstring_memoized(self) -> None:
+        """
+        Check if the same docstring with the same arguments is parsed only once.
+        """
+        clear_parse_cache()
+        docstring = my_function_google.__doc__
+        assert docstring is not None
+        doc = parse_docstring(docstring, ['name', 'age'])
+        assert parse_docstring(docstring, ['name', 'age']) is doc
+        parse_docstring(docstring, ['name'])
+        cache_info = get_parse_cache_info()
+        assert cache_info.hits == 1
+        assert cache_info.misses == 2
+        return
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from enum import Enum
+
+from glacier.core import BuildOptions, _get_click_command
+from tests.utils import get_runner_separating_stderr
+
+FAN_OUT_OPTIONS = BuildOptions(fan_out=True)
+
+
+class Env(Enum):
+    DEV = 'development'
+    PROD = 'production'
+
+
+def greet(_greeting: str, name: str, env: Env, times: int = 1) -> str:
+    """
+    Greet someone.
+    """
+    if name == 'error':
+        raise ValueError('bad name')
+    return f'{_greeting} {name} ({env.name}) x{times}'
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+class TestFanOut(unittest.TestCase):
+    def test_thread(self) -> None:
+        """
+        Check if the command is executed for each JSON line with the command line values as defaults.
+        """
+        command = _get_click_command(greet, options=FAN_OUT_OPTIONS)
+        result = get_runner_separating_stderr().invoke(
+            command,
+            ['hello', '--env', 'development', '--fan-out', '-', '--fan-out-jobs', '2'],
+            input='{"name": "taro", "times": 2}\n\n{"name": "error"}\n{"name": "jiro", "env": "production"}\n',
+        )
+        assert result.exit_code == 1
+        assert result.stdout == 'hello taro (DEV) x2\nhello jiro (PROD) x1\n'
+        assert result.stderr == 'row 2: ValueError: bad name\n'
+        return
+
+    def test_without_fan_out(self) -> None:
+        """
+        Check if the required parameters are still required without fan-out.
+        """
+        command = _get_click_command(greet, options=FAN_OUT_OPTIONS)
+        runner = get_runner_separating_stderr()
+        result = runner.invoke(command, ['hello', '--env', 'development'])
+        assert result.exit_code == 2
+        result = runner.invoke(command, ['hello', '--env', 'development', '--name', 'taro'])
+        assert result.exit_code == 0
+        return
+
+    def test_invalid_row(self) -> None:
+        """
+        Check if the invalid parameter sets are reported before any execution.
+        """
+        command = _get_click_command(greet, options=FAN_OUT_OPTIONS)
+        runner = get_runner_separating_stderr()
+        result = runner.invoke(
+            command, ['hello', '--fan-out', '-'], input='{"name": "taro", "env": "development"}\n{"name": "jiro"}\n'
+        )
+        assert result.exit_code == 2
+        assert result.stdout == ''
+        assert 'row 2: Missing parameter "env"' in result.stderr
+        result = runner.invoke(command, ['hello', '--fan-out', '-'], input='{"name": "taro", "env": "staging"}\n')
+        assert result.exit_code == 2
+        assert 'row 1: env:' in result.stderr
+        return
+
+    def test_output(self) -> None:
+        """
+        Check if the output format of the invocation is used by the workers.
+        """
+
+        def describe(name: str) -> dict:
+            return {'name': name, 'length': len(name)}
+
+        command = _get_click_command(describe, options=BuildOptions(fan_out=True, output_format='json'))
+        result = get_runner_separating_stderr().invoke(
+            command,
+            ['--output', 'jsonl', '--fan-out', '-', '--fan-out-jobs', '2'],
+            input='{"name": "taro"}\n{"name": "jiro"}\n',
+        )
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == '{"name":"taro","length":4}\n{"name":"jiro","length":4}\n'
+        return
+
+    def test_csv_process(self) -> None:
+        """
+        Check if CSV file is fanned out to the process pool.
+        """
+        command = _get_click_command(square, options=FAN_OUT_OPTIONS)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'input.csv')
+            with open(path, 'w') as f:
+                f.write('x\n' + ''.join(f'{x}\n' for x in range(5)))
+            result = get_runner_separating_stderr().invoke(
+                command, ['--fan-out', path, '--fan-out-executor', 'process', '--fan-out-jobs', '2']
+            )
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == '0\n1\n4\n9\n16\n'
+        return
+
+    def test_async(self) -> None:
+        """
+        Check if async function is fanned out on the event loop with the bounded concurrency.
+        """
+        running = 0
+        max_running = 0
+
+        async def fetch(index: int) -> int:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01 * (5 - index))
+            running -= 1
+            return index
+
+        command = _get_click_command(fetch, options=FAN_OUT_OPTIONS)
+        runner = get_runner_separating_stderr()
+        rows = ''.join(f'{{"index": {index}}}\n' for index in range(5))
+        result = runner.invoke(command, ['--fan-out', '-', '--fan-out-jobs', '3'], input=rows)
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == '0\n1\n2\n3\n4\n'
+        assert max_running == 3
+
+        result = runner.invoke(command, ['--fan-out', '-', '--fan-out-unordered'], input=rows)
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == '4\n3\n2\n1\n0\n'
+
+        result = runner.invoke(command, ['--fan-out', '-', '--fan-out-executor', 'thread'], input=rows)
+        assert result.exit_code == 2
+        return
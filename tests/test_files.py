@@ -0,0 +1,70 @@
+import mmap
+import os
+import tempfile
+import unittest
+from typing import BinaryIO, List, TextIO
+
+from glacier.core import _get_click_command
+from glacier.files import MappedFile, TextOutput
+from tests.utils import get_runner_separating_stderr
+
+
+class TestFiles(unittest.TestCase):
+    def test_text_files(self) -> None:
+        """
+        Check if the text files are opened lazily, with "-" for stdin and stdout.
+        """
+
+        def upper(_src: TextIO, dest: TextOutput, dry_run: bool = False) -> None:
+            if not dry_run:
+                dest.write(_src.read().upper())
+
+        command = _get_click_command(upper)
+        runner = get_runner_separating_stderr()
+        result = runner.invoke(command, ['-', '--dest', '-'], input='hello\n')
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == 'HELLO\n'
+
+        with tempfile.TemporaryDirectory() as directory:
+            src = os.path.join(directory, 'src.txt')
+            dest = os.path.join(directory, 'dest.txt')
+            with open(src, 'w') as f:
+                f.write('abc')
+            result = runner.invoke(command, [src, '--dest', dest, '--dry-run'])
+            assert result.exit_code == 0, result.stderr
+            # Not created since it is never written.
+            assert not os.path.exists(dest)
+            result = runner.invoke(command, [src, '--dest', dest])
+            assert result.exit_code == 0, result.stderr
+            with open(dest) as f:
+                assert f.read() == 'ABC'
+            result = runner.invoke(command, [os.path.join(directory, 'missing.txt'), '--dest', dest])
+            assert result.exit_code == 2
+        return
+
+    def test_mapped_file(self) -> None:
+        """
+        Check if the file is mapped into memory, and closed after the command.
+        """
+        mapped_files: List[MappedFile] = []
+
+        def count(_data: MappedFile, header: BinaryIO) -> None:
+            mapped_files.append(_data)
+            print(_data[:4].decode(), bytes(_data).count(b'x'), header.read(2).decode())
+
+        command = _get_click_command(count)
+        runner = get_runner_separating_stderr()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.bin')
+            with open(path, 'wb') as f:
+                f.write(b'head' + b'x' * 10000)
+            result = runner.invoke(command, [path, '--header', path])
+            assert result.exit_code == 0, result.stderr
+            assert result.stdout == 'head 10000 he\n'
+            assert isinstance(mapped_files[0], mmap.mmap)
+            assert mapped_files[0].closed
+
+            result = runner.invoke(command, ['-', '--header', path], input='from stdin x')
+            assert result.exit_code == 0, result.stderr
+            assert result.stdout == 'from 1 he\n'
+        return
@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from click.testing import CliRunner
+
+from glacier.core import GlacierCommand, glacier, glacier_group
+from glacier.help import HelpCache
+from tests.test_completion import greet, paint
+
+
+class TestHelpCache(unittest.TestCase):
+    def test_help_rendered_once(self) -> None:
+        """
+        Check if the help is rendered only once within the process.
+        """
+        group = glacier_group([paint, greet])
+        with mock.patch.object(GlacierCommand, '_render_help', autospec=True, return_value='Help of paint.') as render:
+            for _ in range(2):
+                result = CliRunner().invoke(group, ['paint', '-h'])
+                assert not result.exception
+                assert result.output == 'Help of paint.\n'
+        # The command is built once in the lazy group.
+        assert render.call_count == 1
+        return
+
+    def test_help_cache_invalidated(self) -> None:
+        """
+        Check if the cached help is not used after the source file is modified.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_path = os.path.join(tmp_dir, 'source.py')
+            with open(source_path, 'w') as source:
+                source.write('')
+            cache_path = os.path.join(tmp_dir, 'help.json')
+            HelpCache(cache_path, [source_path]).set('mytool paint', 80, 'Help of paint.')
+
+            help_cache = HelpCache(cache_path, [source_path])
+            assert help_cache.get('mytool paint', 80) == 'Help of paint.'
+            assert help_cache.get('mytool paint', 100) is None
+            assert help_cache.lookup('mytool', ['paint', '--color', '-h'], ['-h', '--help'], 120) is None
+
+            with open(source_path, 'w') as source:
+                source.write('# modified')
+            assert HelpCache(cache_path, [source_path]).get('mytool paint', 80) is None
+        return
+
+    def test_help_from_disk(self) -> None:
+        """
+        Check if the help is written from the disk without building the commands.
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = {'GLACIER_CACHE_DIR': cache_dir}
+            with mock.patch.object(sys, 'argv', ['mytool', 'paint', '--help']), mock.patch.dict(os.environ, env):
+                with CliRunner().isolation() as streams, self.assertRaises(SystemExit):
+                    glacier([paint, greet])
+                expected = streams[0].getvalue().decode()
+                assert 'Paint with the color.' in expected
+
+                with mock.patch('glacier.core.glacier_group', side_effect=AssertionError):
+                    with CliRunner().isolation() as streams, self.assertRaises(SystemExit) as exit_context:
+                        glacier([paint, greet])
+                assert exit_context.exception.code == 0
+                assert streams[0].getvalue().decode() == expected
+        return
+
+    def test_help_cache_registration(self) -> None:
+        """
+        Check if the cached help is not used after the registered commands are changed.
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = {'GLACIER_CACHE_DIR': cache_dir}
+            with mock.patch.object(sys, 'argv', ['mytool', '--help']), mock.patch.dict(os.environ, env):
+                for name in ['hello', 'greet']:
+                    with CliRunner().isolation() as streams, self.assertRaises(SystemExit):
+                        glacier({name: paint, 'other': greet})
+                    assert f'  {name} ' in streams[0].getvalue().decode()
+        return
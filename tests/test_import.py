@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import unittest
+from typing import Dict
+
+# Budget of the cumulative import time of glacier (including click) in milliseconds,
+# e.g., 120 (20% over the import time before the optional machinery was added on a quiet machine).
+# The wall-clock time depends on the machine, so it is checked only if the budget is given,
+# and `test_deferred_imports` is the deterministic check of the import cost.
+IMPORT_TIME_BUDGET_ENV = 'GLACIER_IMPORT_TIME_BUDGET_MS'
+
+# Modules of glacier imported by `import glacier`.
+EAGER_GLACIER_MODULES = {
+    'glacier',
+    'glacier.cache',
+    'glacier.concurrency',
+    'glacier.core',
+    'glacier.docstring',
+    'glacier.misc',
+}
+
+# Modules which must be imported only when they are actually used.
+DEFERRED_MODULES = [
+    'asyncio',
+    'click_completion',
+    'click_help_colors',
+    'concurrent.futures',
+    'cProfile',
+    'csv',
+    'decimal',
+    'mmap',
+    'pathlib',
+    'tempfile',
+    'typing_extensions',
+]
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_import_times() -> Dict[str, int]:
+    """
+    Return the cumulative import time (us) of each module reported by `-X importtime`.
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import glacier'],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT_DIR,
+    )
+    res = {}
+    for line in proc.stderr.splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[1].isdigit():
+            res[fields[2]] = int(fields[1])
+    return res
+
+
+class TestImport(unittest.TestCase):
+    @unittest.skipUnless(os.environ.get(IMPORT_TIME_BUDGET_ENV), f'{IMPORT_TIME_BUDGET_ENV} is not set')
+    def test_import_time(self) -> None:
+        """
+        Check if `import glacier` is within the budget (best of three).
+        """
+        budget_ms = float(os.environ[IMPORT_TIME_BUDGET_ENV])
+        elapsed_ms = min(get_import_times()['glacier'] for _ in range(3)) / 1000
+        assert elapsed_ms < budget_ms, f'import glacier took {elapsed_ms}ms'
+        return
+
+    def test_deferred_imports(self) -> None:
+        """
+        Check if optional machinery is not imported by `import glacier`.
+        """
+        imported = get_import_times()
+        for module in DEFERRED_MODULES:
+            assert module not in imported, f'{module} is imported by glacier'
+        assert {module for module in imported if module.split('.')[0] == 'glacier'} == EAGER_GLACIER_MODULES
+        return
@@ -0,0 +1,106 @@
+import os
+import socket
+import tempfile
+import unittest
+from typing import Any, List
+
+from glacier.core import BuildOptions, CommandSpec, _get_click_command, glacier_group
+from glacier.metrics import PrometheusTextfileMiddleware, StatsDMiddleware
+from glacier.middleware import Call, Middleware, apply_middlewares
+from tests.test_completion import Color, paint
+from tests.utils import get_runner_separating_stderr
+
+
+class RecordingMiddleware(Middleware):
+    def __init__(self) -> None:
+        self.events: List[Any] = []
+
+    def before(self, call: Call) -> None:
+        self.events.append(('before', call.command, dict(call.kwargs)))
+
+    async def after(self, call: Call, result: Any) -> None:
+        self.events.append(('after', call.command, result))
+
+    def error(self, call: Call, exc: BaseException) -> None:
+        self.events.append(('error', call.command, type(exc)))
+
+
+def fail(code: int) -> None:
+    raise SystemExit(code)
+
+
+async def double(value: int) -> int:
+    return value * 2
+
+
+class TestMiddleware(unittest.TestCase):
+    def test_hooks(self) -> None:
+        """
+        Check if the hooks are called with the converted arguments, the result, and the exception.
+        """
+        middleware = RecordingMiddleware()
+        options = BuildOptions(middlewares=(middleware,))
+        runner = get_runner_separating_stderr()
+
+        result = runner.invoke(_get_click_command(paint, options=options), ['--color', 'red'])
+        assert not result.exception
+        result = runner.invoke(_get_click_command(double, options=options), ['--value', '3'])
+        assert not result.exception
+        result = runner.invoke(_get_click_command(fail, options=options), ['--code', '3'])
+        assert result.exit_code == 3
+        assert middleware.events == [
+            ('before', 'paint', {'color': Color.RED, 'verbose': False}),
+            ('after', 'paint', None),
+            ('before', 'double', {'value': 3}),
+            ('after', 'double', 6),
+            ('before', 'fail', {'code': 3}),
+            ('error', 'fail', SystemExit),
+        ]
+        return
+
+    def test_no_hooks(self) -> None:
+        """
+        Check if the function is not wrapped if no hook is overridden.
+        """
+        assert apply_middlewares(paint, 'paint', [Middleware()]) is paint
+        assert CommandSpec.of_function(fail).callback is fail
+        return
+
+    def test_prometheus_textfile(self) -> None:
+        """
+        Check if the histogram and the exit codes are accumulated in the textfile across the calls.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'mytool.prom')
+            middleware = PrometheusTextfileMiddleware(path, prefix='mytool', buckets=[1.0, 1e9])
+            group = glacier_group([paint, fail], options=BuildOptions(middlewares=(middleware,)))
+            runner = get_runner_separating_stderr()
+            for args in [['paint', '--color', 'red'], ['paint', '--color', 'blue'], ['fail', '--code', '2']]:
+                runner.invoke(group, args)
+            with open(path) as textfile:
+                lines = textfile.read().splitlines()
+
+        assert '# TYPE mytool_command_duration_seconds histogram' in lines
+        assert 'mytool_command_duration_seconds_bucket{command="paint",le="1000000000"} 2' in lines
+        assert 'mytool_command_duration_seconds_bucket{command="paint",le="+Inf"} 2' in lines
+        assert 'mytool_command_duration_seconds_count{command="paint"} 2' in lines
+        assert 'mytool_command_duration_seconds_count{command="fail"} 1' in lines
+        assert '# TYPE mytool_command_exit_total counter' in lines
+        assert 'mytool_command_exit_total{command="paint",code="0"} 2' in lines
+        assert 'mytool_command_exit_total{command="fail",code="2"} 1' in lines
+        return
+
+    def test_statsd(self) -> None:
+        """
+        Check if the timing and the counters are sent to StatsD.
+        """
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as server:
+            server.bind(('127.0.0.1', 0))
+            server.settimeout(5)
+            middleware = StatsDMiddleware(port=server.getsockname()[1], prefix='mytool')
+            command = _get_click_command(fail, options=BuildOptions(middlewares=(middleware,)))
+            get_runner_separating_stderr().invoke(command, ['--code', '4'])
+            lines = server.recv(4096).decode().splitlines()
+        assert lines[0].startswith('mytool.fail.duration:') and lines[0].endswith('|ms')
+        assert lines[1:] == ['mytool.fail.calls:1|c', 'mytool.fail.exit_code.4:1|c']
+        return
@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+from typing import Any, AsyncIterator, List
+
+from click.testing import CliRunner
+
+from glacier.core import BuildOptions, _get_click_command
+from glacier.misc import AsyncRunner, coro
+
+
+class TestAsyncRunner(unittest.TestCase):
+    def test_loop_reused(self) -> None:
+        """
+        Check if one event loop is shared by the coroutines run by the runner.
+        """
+        loops: List[Any] = []
+
+        async def f() -> int:
+            loops.append(asyncio.get_running_loop())
+            return len(loops)
+
+        runner = AsyncRunner()
+        wrapped = coro(f, runner)
+        assert wrapped() == 1
+        assert wrapped() == 2
+        assert loops[0] is loops[1]
+        runner.close()
+        assert loops[0].is_closed()
+        return
+
+    def test_loop_factory(self) -> None:
+        """
+        Check if the loop is created by the given factory.
+        """
+        created: List[Any] = []
+
+        def loop_factory() -> Any:
+            loop = asyncio.new_event_loop()
+            created.append(loop)
+            return loop
+
+        runner = AsyncRunner(loop_factory=loop_factory, max_workers=2)
+
+        async def f() -> None:
+            loop = asyncio.get_running_loop()
+            assert loop is created[0]
+            await loop.run_in_executor(None, print, 'in executor')
+
+        command = _get_click_command(f, options=BuildOptions(runner=runner))
+        result = CliRunner().invoke(command, [])
+        assert result.output == 'in executor\n'
+        runner.close()
+        return
+
+    def test_close_async_generators(self) -> None:
+        """
+        Check if async generators are finalized when the runner is closed.
+        """
+        finalized: List[bool] = []
+
+        async def gen() -> AsyncIterator[int]:
+            try:
+                yield 1
+                yield 2
+            finally:
+                finalized.append(True)
+
+        async def f() -> int:
+            agen = gen()
+            return await agen.__anext__()
+
+        runner = AsyncRunner()
+        assert runner.run(f()) == 1
+        runner.close()
+        assert finalized == [True]
+        return
@@ -0,0 +1,92 @@
+import unittest
+from dataclasses import dataclass
+from enum import Enum
+from typing import List
+from unittest import mock
+
+from glacier.core import BuildOptions, _get_click_command
+from glacier.output import dumps
+from tests.utils import get_runner_separating_stderr
+
+
+class Env(Enum):
+    DEV = 'development'
+    PROD = 'production'
+
+
+@dataclass
+class Server:
+    name: str
+    env: Env
+    tags: List[str]
+
+
+def servers(count: int = 2) -> List[Server]:
+    return [Server(name=f'server-{i}', env=Env.DEV if i % 2 == 0 else Env.PROD, tags=['a']) for i in range(count)]
+
+
+def nothing() -> None:
+    print('nothing')
+
+
+def save(output: str) -> str:
+    return output
+
+
+class TestOutput(unittest.TestCase):
+    def test_formats(self) -> None:
+        """
+        Check if the return value is written in each format.
+        """
+        command = _get_click_command(servers, options=BuildOptions(output_format='jsonl'))
+        runner = get_runner_separating_stderr()
+        result = runner.invoke(command, [])
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == (
+            '{"name":"server-0","env":"development","tags":["a"]}\n'
+            '{"name":"server-1","env":"production","tags":["a"]}\n'
+        )
+        result = runner.invoke(command, ['--count', '1', '--output', 'json'])
+        assert (
+            result.stdout
+            == '[\n  {\n    "name": "server-0",\n    "env": "development",\n    "tags": [\n      "a"\n    ]\n  }\n]\n'
+        )
+        result = runner.invoke(command, ['--output', 'csv'])
+        assert result.stdout == 'name,env,tags\nserver-0,development,"[""a""]"\nserver-1,production,"[""a""]"\n'
+        result = runner.invoke(command, ['--output', 'table'])
+        assert result.stdout == (
+            'name      env          tags\nserver-0  development  ["a"]\nserver-1  production   ["a"]\n'
+        )
+        return
+
+    def test_none(self) -> None:
+        """
+        Check if None is not written.
+        """
+        command = _get_click_command(nothing, options=BuildOptions(output_format='json'))
+        result = get_runner_separating_stderr().invoke(command, [])
+        assert result.stdout == 'nothing\n'
+        return
+
+    def test_stdlib_fallback(self) -> None:
+        """
+        Check if the standard library serializes same as orjson.
+        """
+        value = {'server': servers(1)[0], 'ids': {1}, 'big': 2**70, 'text': 'あ'}
+        expected = (
+            '{"server":{"name":"server-0","env":"development","tags":["a"]},'
+            '"ids":[1],"big":1180591620717411303424,"text":"あ"}'
+        )
+        assert dumps(value).decode() == expected
+        with mock.patch('glacier.output._get_orjson', return_value=None):
+            assert dumps(value).decode() == expected
+        return
+
+    def test_option_collision(self) -> None:
+        """
+        Check if the parameter colliding with the option of glacier is rejected when the command is built.
+        """
+        with self.assertRaisesRegex(ValueError, '--output of the command save'):
+            _get_click_command(save, options=BuildOptions(output_format='json'))
+        assert _get_click_command(save).params[0].opts == ['--output']
+        return
@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from glacier.core import glacier
+from glacier.profiling import Profiler, get_profile_request, get_profiler, stop_profiler, strip_profile_options
+from tests.test_completion import greet, paint
+from tests.utils import get_runner_separating_stderr
+
+
+class TestProfiling(unittest.TestCase):
+    def test_profile_request(self) -> None:
+        """
+        Check if the profile is requested by the options or the environment variables.
+        """
+        with mock.patch.dict(os.environ, {'GLACIER_PROFILE': '', 'GLACIER_PROFILE_OUTPUT': ''}):
+            assert get_profile_request(['paint', '--color', 'red']) == (False, None)
+            assert get_profile_request(['--glacier-profile', 'paint']) == (True, None)
+            assert get_profile_request(['--glacier-profile-output', 'a.json', 'paint']) == (True, 'a.json')
+            assert get_profile_request(['--glacier-profile-output=a.pstats']) == (True, 'a.pstats')
+            assert get_profile_request(['paint', '--', '--glacier-profile']) == (False, None)
+        for value in ('0', 'false', 'False'):
+            with mock.patch.dict(os.environ, {'GLACIER_PROFILE': value, 'GLACIER_PROFILE_OUTPUT': ''}):
+                assert get_profile_request([]) == (False, None)
+        with mock.patch.dict(os.environ, {'GLACIER_PROFILE': '1', 'GLACIER_PROFILE_OUTPUT': ''}):
+            assert get_profile_request([]) == (True, None)
+        with mock.patch.dict(os.environ, {'GLACIER_PROFILE': '', 'GLACIER_PROFILE_OUTPUT': 'trace.json'}):
+            assert get_profile_request([]) == (True, 'trace.json')
+
+        assert strip_profile_options(['paint', '--glacier-profile', '--color', 'red']) == ['paint', '--color', 'red']
+        assert strip_profile_options(['--glacier-profile-output', 'a.json', 'paint']) == ['paint']
+        assert strip_profile_options(['paint', '--glacier-profile-output=a.json']) == ['paint']
+        assert strip_profile_options(['paint', '--', '--glacier-profile']) == ['paint', '--', '--glacier-profile']
+        return
+
+    def test_report(self) -> None:
+        """
+        Check if the phases are reported under the phases containing them, and written as Chrome trace.
+        """
+        profiler = Profiler(origin=0.0)
+        profiler.add('build', 1.0, 2.0)
+        profiler.add('docstring paint', 1.5, 1.75)
+        profiler.add('function paint', 3.0, 3.5)
+        stream = io.StringIO()
+        profiler.report(stream)
+        assert stream.getvalue() == (
+            'glacier profile (ms):\n  1000.000  build\n   250.000    docstring paint\n   500.000  function paint\n'
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_path = os.path.join(tmp_dir, 'trace.json')
+            profiler.dump(trace_path)
+            with open(trace_path) as trace_file:
+                events = json.load(trace_file)['traceEvents']
+        assert [(event['name'], event['ts'], event['dur']) for event in events] == [
+            ('build', 1e6, 1e6),
+            ('docstring paint', 1.5e6, 0.25e6),
+            ('function paint', 3e6, 0.5e6),
+        ]
+        return
+
+    def test_profile_option(self) -> None:
+        """
+        Check if the phases of the invocation are reported by `--glacier-profile`.
+        """
+        # The option is accepted after the subcommand as well.
+        argv = ['mytool', 'paint', '--glacier-profile', '--color', 'red']
+        with mock.patch.object(sys, 'argv', argv), mock.patch.dict(os.environ, {'GLACIER_NO_CACHE': '1'}):
+            with get_runner_separating_stderr().isolation() as streams:
+                try:
+                    with self.assertRaises(SystemExit) as exit_context:
+                        glacier([paint, greet])
+                    assert get_profiler() is not None
+                finally:
+                    sys.stdout.flush()
+                    stop_profiler()
+        assert exit_context.exception.code == 0
+        assert streams[0].getvalue().decode() == 'Color.RED\n'
+        report = streams[1].getvalue().decode()
+        # The program name of the parsed command depends on how the tests are run.
+        for name in ['import glacier', 'build paint', 'docstring paint', 'parse ', 'convert color', 'function paint']:
+            assert name in report, name
+        assert get_profiler() is None
+        return
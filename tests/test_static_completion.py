@@ -0,0 +1,64 @@
+import shutil
+import subprocess
+import unittest
+
+from glacier.core import glacier_group
+from tests.test_completion import greet, paint
+from tests.utils import get_runner_separating_stderr
+
+BASH_COMPLETE = """
+source /dev/stdin <<'SCRIPT'
+{script}
+SCRIPT
+COMP_WORDS=({words})
+COMP_CWORD=$((${{#COMP_WORDS[@]}} - 1))
+_mytool_glacier_complete
+echo "${{COMPREPLY[*]}}"
+"""
+
+
+class TestStaticCompletion(unittest.TestCase):
+    def get_script(self, shell: str) -> str:
+        result = get_runner_separating_stderr().invoke(
+            glacier_group([paint, greet]),
+            ['completion-script', shell, '--prog-name', 'mytool'],
+        )
+        assert not result.exception, result.output
+        return result.output
+
+    @unittest.skipIf(shutil.which('bash') is None, 'bash is not installed')
+    def test_bash_completion_script(self) -> None:
+        """
+        Check if the bash completion script completes subcommands, options, and choices.
+        """
+        script = self.get_script('bash')
+        expectations = {
+            "mytool ''": 'greet paint',
+            'mytool p': 'paint',
+            'mytool paint --': '--color --verbose --help',
+            "mytool paint --color ''": 'red blue',
+            "mytool paint --color red --verbose ''": '',
+        }
+        for words, expected in expectations.items():
+            completed = subprocess.run(
+                ['bash', '-c', BASH_COMPLETE.format(script=script, words=words)],
+                stdout=subprocess.PIPE,
+                check=True,
+                universal_newlines=True,
+            )
+            assert completed.stdout.strip() == expected, words
+        return
+
+    def test_completion_scripts(self) -> None:
+        """
+        Check if the data of the commands is written in the scripts of zsh and fish.
+        """
+        zsh_script = self.get_script('zsh')
+        assert zsh_script.startswith('#compdef mytool\n')
+        assert "'option:/paint --color') echo '1 choice red blue' ;;" in zsh_script
+        assert 'compdef _mytool_glacier_complete mytool' in zsh_script
+
+        fish_script = self.get_script('fish')
+        assert "case 'option:/paint --color'\n            echo '1 choice red blue'" in fish_script
+        assert "complete -c mytool -f -a '(_mytool_glacier_complete)'" in fish_script
+        return
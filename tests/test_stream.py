@@ -0,0 +1,77 @@
+import io
+import time
+import unittest
+from typing import AsyncIterator, Dict, Iterator
+
+from glacier.core import BuildOptions, _get_click_command
+from glacier.stream import LineFormatter, StreamWriter
+from tests.utils import get_runner_separating_stderr
+
+
+def numbers(count: int) -> Iterator[Dict[str, int]]:
+    for i in range(count):
+        yield {'i': i, 'square': i * i}
+
+
+async def async_numbers(count: int) -> AsyncIterator[int]:
+    for i in range(count):
+        yield i
+
+
+class TestStream(unittest.TestCase):
+    def test_generator(self) -> None:
+        """
+        Check if the items yielded by the generator are written in each format.
+        """
+        command = _get_click_command(numbers)
+        runner = get_runner_separating_stderr()
+        result = runner.invoke(command, ['--count', '2'])
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == "{'i': 0, 'square': 0}\n{'i': 1, 'square': 1}\n"
+        result = runner.invoke(command, ['--count', '2', '--stream-format', 'jsonl'])
+        assert result.stdout == '{"i":0,"square":0}\n{"i":1,"square":1}\n'
+        result = runner.invoke(command, ['--count', '3', '--stream-format', 'csv'])
+        assert result.stdout == 'i,square\n0,0\n1,1\n2,4\n'
+        return
+
+    def test_async_generator(self) -> None:
+        """
+        Check if the items yielded by the async generator are written with the default format.
+        """
+        command = _get_click_command(async_numbers, options=BuildOptions(stream_format='csv'))
+        result = get_runner_separating_stderr().invoke(command, ['--count', '3'])
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == '0\n1\n2\n'
+        return
+
+    def test_writer_buffering(self) -> None:
+        """
+        Check if the writer writes the first item immediately, and flushes when the buffer is full.
+        """
+        stream = io.StringIO()
+        with StreamWriter(LineFormatter(), stream, buffer_size=4, flush_interval=60) as writer:
+            writer.write('a')
+            assert stream.getvalue() == 'a\n'
+            writer.write('b')
+            assert stream.getvalue() == 'a\n'
+            writer.write('c')
+            assert stream.getvalue() == 'a\nb\nc\n'
+            writer.write('d')
+            assert stream.getvalue() == 'a\nb\nc\n'
+        assert stream.getvalue() == 'a\nb\nc\nd\n'
+        return
+
+    def test_writer_timer(self) -> None:
+        """
+        Check if the buffered item is flushed by the timer without waiting for the next item.
+        """
+        stream = io.StringIO()
+        with StreamWriter(LineFormatter(), stream, flush_interval=0.01) as writer:
+            writer.write('a')
+            writer.write('b')
+            for _ in range(100):
+                if stream.getvalue() == 'a\nb\n':
+                    break
+                time.sleep(0.01)
+            assert stream.getvalue() == 'a\nb\n'
+        return
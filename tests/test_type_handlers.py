@@ -0,0 +1,82 @@
+import unittest
+from pathlib import Path
+from typing import List, Literal, Optional, Tuple
+
+import click
+
+from glacier.core import _get_click_command
+from glacier.type_handlers import TypeHandler, register_type, resolve_type_handler, unregister_type
+from tests.utils import get_runner_separating_stderr
+
+
+class Point:
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
+
+    @classmethod
+    def parse(cls, text: str) -> 'Point':
+        x, y = text.split(',')
+        return cls(int(x), int(y))
+
+
+class TestTypeHandlers(unittest.TestCase):
+    def test_types(self) -> None:
+        """
+        Check if the parameters of various types are given on the command line.
+        """
+
+        def f(
+            _paths: List[Path],
+            ratio: float,
+            ids: List[int],
+            size: Tuple[int, str],
+            mode: Literal['fast', 'slow'],
+            level: Literal[1, 2] = 1,
+            name: Optional[str] = None,
+            unknown: object = None,
+        ) -> None:
+            assert all(isinstance(path, Path) for path in _paths)
+            assert isinstance(ratio, float)
+            assert unknown is None
+            print(len(_paths), ratio, ids, size, mode, level, name)
+
+        command = _get_click_command(f)
+        runner = get_runner_separating_stderr()
+        result = runner.invoke(
+            command,
+            ['a', 'b', '--ratio', '0.5', '--ids', '1', '--ids', '2', '--size', '3', 'px', '--mode', 'fast'],
+        )
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == "2 0.5 [1, 2] (3, 'px') fast 1 None\n"
+        result = runner.invoke(
+            command,
+            ['a', '--ratio', '1', '--ids', '3', '--size', '3', 'px', '--mode', 'slow', '--level', '2', '--name', 'x'],
+        )
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout == "1 1.0 [3] (3, 'px') slow 2 x\n"
+        result = runner.invoke(command, ['a', '--ratio', '1', '--size', '3', 'px', '--mode', 'medium'])
+        assert result.exit_code == 2
+        return
+
+    def test_register_type(self) -> None:
+        """
+        Check if the registered type is converted, and the resolution is cached.
+        """
+        register_type(Point, TypeHandler(click.STRING, Point.parse))
+        try:
+
+            def f(point: Point, points: List[Point]) -> None:
+                print(point.x + point.y, [p.x for p in points])
+
+            command = _get_click_command(f)
+            result = get_runner_separating_stderr().invoke(
+                command, ['--point', '1,2', '--points', '3,4', '--points', '5,6']
+            )
+            assert result.exit_code == 0, result.stderr
+            assert result.stdout == '3 [3, 5]\n'
+            assert resolve_type_handler(List[Point]) is resolve_type_handler(List[Point])
+        finally:
+            unregister_type(Point)
+        assert resolve_type_handler(Point) is None
+        return
@@ -1,7 +1,21 @@
 import re
-from typing import Dict, List
+from typing import Any, Dict, List
 from dataclasses import dataclass
 
+from click.testing import CliRunner
+
+
+def get_runner_separating_stderr() -> CliRunner:
+    """
+    Return CliRunner whose result has stdout and stderr separately
+    (click<8.2 mixes them by default).
+    """
+    kwargs: Dict[str, Any] = {'mix_stderr': False}
+    try:
+        return CliRunner(**kwargs)
+    except TypeError:
+        return CliRunner()
+
 
 def get_values(output_str: str) -> Dict[str, str]:
     """